@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -75,12 +76,55 @@ WSGI_APPLICATION = "EventManagementApp.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# Run on every new SQLite connection. WAL lets readers proceed during a write,
+# busy_timeout (ms) makes writers queue instead of failing with "database is
+# locked", and synchronous=NORMAL is durable enough under WAL.
+SQLITE_INIT_COMMAND = os.environ.get(
+    "SQLITE_INIT_COMMAND",
+    "PRAGMA journal_mode=WAL;"
+    "PRAGMA busy_timeout=5000;"
+    "PRAGMA synchronous=NORMAL;"
+    "PRAGMA mmap_size=134217728;"
+    "PRAGMA cache_size=-20000;",
+)
+
+# DB_ENGINE=postgresql switches to PostgreSQL, configured by the other DB_*
+# variables; anything else keeps the bundled SQLite file.
+DB_ENGINE = os.environ.get("DB_ENGINE", "sqlite")
+
+if DB_ENGINE == "postgresql":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("DB_NAME", "events"),
+            "USER": os.environ.get("DB_USER", "postgres"),
+            "PASSWORD": os.environ.get("DB_PASSWORD", ""),
+            "HOST": os.environ.get("DB_HOST", "localhost"),
+            "PORT": os.environ.get("DB_PORT", "5432"),
+            # Reuse connections across requests; a health check before each
+            # request replaces any that the server dropped in the meantime
+            "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+            "CONN_HEALTH_CHECKS": True,
+            "TEST": {"NAME": os.environ.get("DB_TEST_NAME")},
+        }
+    }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "EventManagementApp.sqlite3",
+            "NAME": os.environ.get("DB_NAME", BASE_DIR / "db.sqlite3"),
+            # Opening an SQLite file is cheap, so connections are only kept when asked to
+            "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 0)),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                "init_command": SQLITE_INIT_COMMAND,
+                # Write transactions (events.transactions.atomic_write) take the write lock
+                # when they start rather than on their first write; others stay deferred
+                "transaction_mode": os.environ.get("SQLITE_TRANSACTION_MODE") or None,
+                "write_transaction_mode": os.environ.get("SQLITE_WRITE_TRANSACTION_MODE", "IMMEDIATE"),
+            },
+        }
     }
-}
 
 
 # Password validation
@@ -126,8 +170,63 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'events.authentication.CachedJWTAuthentication',
+    ),
+    'DEFAULT_THROTTLE_CLASSES': (
+        'events.throttling.TokenBucketThrottle',
     ),
+    # Per user, or per IP address for anonymous clients; a full period's worth can be spent in a burst
+    'DEFAULT_THROTTLE_RATES': {
+        'read': os.environ.get("THROTTLE_READ_RATE", "600/min"),
+        'write': os.environ.get("THROTTLE_WRITE_RATE", "120/min"),
+        'export': os.environ.get("THROTTLE_EXPORT_RATE", "30/hour"),
+    },
+    # Reverse proxies in front of the app; X-Forwarded-For is only read when this is above 0
+    'NUM_PROXIES': int(os.environ.get("NUM_PROXIES", "0")),
+}
+
+# Set to a cache alias to share throttle budgets between processes; by default each process counts alone
+THROTTLE_CACHE_ALIAS = os.environ.get("THROTTLE_CACHE_ALIAS") or None
+
+SIMPLE_JWT = {
+    # Adds the is_staff / is_superuser claims that token-only users read
+    'TOKEN_OBTAIN_SERIALIZER': 'events.serializers.TokenObtainPairSerializer',
 }
 
+# Seconds an authenticated user is served from the per-process cache; 0 disables it
+JWT_USER_CACHE_TTL = int(os.environ.get("JWT_USER_CACHE_TTL", 30))
+
 AUTH_USER_MODEL = 'events.User'
+
+# Registration export jobs
+EXPORT_STORAGE_DIR = BASE_DIR / "exports"
+EXPORT_JOB_WORKERS = 2
+# Run export jobs inline instead of on the worker pool (useful for tests)
+EXPORT_JOBS_EAGER = False
+# Seconds without progress after which a queued or running job is given up and can be started again
+EXPORT_JOB_TIMEOUT = 600
+
+# List endpoints: default and maximum ?page_size=
+API_PAGE_SIZE = 10
+API_MAX_PAGE_SIZE = 100
+
+# Cached event and venue responses. Set RESPONSE_CACHE_DIR to a directory shared
+# by all worker processes to share the cache between them.
+RESPONSE_CACHE_ALIAS = "responses"
+RESPONSE_CACHE_TIMEOUT = 300
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "responses": (
+        {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.environ["RESPONSE_CACHE_DIR"],
+        }
+        if os.environ.get("RESPONSE_CACHE_DIR") else
+        {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "responses",
+        }
+    ),
+}
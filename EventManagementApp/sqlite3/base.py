@@ -0,0 +1,78 @@
+from contextlib import contextmanager
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite with the ``init_command`` and ``transaction_mode`` options of
+    Django 5.1, so ``DATABASES`` can keep the same ``OPTIONS`` after upgrading
+    back to the stock backend.
+
+    ``init_command`` holds ``;``-separated statements run on every new
+    connection (typically PRAGMAs). ``transaction_mode`` picks the ``BEGIN``
+    used by every ``atomic``. ``write_transaction_mode`` picks the one used by
+    transactions opened inside ``writing()``; ``IMMEDIATE`` takes the write lock
+    up front, so a transaction that reads before writing waits on
+    ``busy_timeout`` instead of failing with "database is locked" when it tries
+    to upgrade its lock.
+    """
+    transaction_modes = frozenset(["DEFERRED", "EXCLUSIVE", "IMMEDIATE"])
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.begins_write = False
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop("init_command", None)
+        params.pop("transaction_mode", None)
+        params.pop("write_transaction_mode", None)
+        return params
+
+    @property
+    def init_commands(self):
+        init_command = self.settings_dict["OPTIONS"].get("init_command") or ""
+        return [command.strip() for command in init_command.split(";") if command.strip()]
+
+    def _mode_option(self, name):
+        mode = self.settings_dict["OPTIONS"].get(name)
+        if mode is None:
+            return None
+        mode = mode.upper()
+        if mode not in self.transaction_modes:
+            raise ImproperlyConfigured(
+                f"settings.DATABASES[{self.alias!r}]['OPTIONS'][{name!r}] is "
+                f"improperly configured to '{mode}'. Use one of {', '.join(sorted(self.transaction_modes))}, or None."
+            )
+        return mode
+
+    @property
+    def transaction_mode(self):
+        return self._mode_option("transaction_mode")
+
+    @property
+    def write_transaction_mode(self):
+        return self._mode_option("write_transaction_mode")
+
+    @contextmanager
+    def writing(self):
+        """Begin a transaction opened in this block with ``write_transaction_mode``."""
+        previous, self.begins_write = self.begins_write, True
+        try:
+            yield
+        finally:
+            self.begins_write = previous
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for command in self.init_commands:
+            conn.execute(command)
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        mode = (self.begins_write and self.write_transaction_mode) or self.transaction_mode
+        if mode is None:
+            return super()._start_transaction_under_autocommit()
+        self.cursor().execute(f"BEGIN {mode}")
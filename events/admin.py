@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.core.exceptions import ValidationError
 
-from .models import Venue, Event, Registration, User
+from .models import Venue, Event, Registration, User, WaitlistEntry
 
 admin.site.register(User)
 
@@ -37,4 +37,31 @@ class EventAdmin(admin.ModelAdmin):
 admin.site.register(Event, EventAdmin)
 
 
-admin.site.register(Registration)
+class RegistrationAdmin(admin.ModelAdmin):
+    list_display = ('user', 'event', 'registration_date', 'accepted', 'rejected')
+    list_filter = ('accepted', 'rejected')
+    actions = ['accept_registrations', 'reject_registrations']
+
+    def _moderate(self, request, queryset, accept):
+        updated, skipped = queryset.moderate(accept=accept)
+        message = f"{updated} registration(s) {'accepted' if accept else 'rejected'}."
+        if skipped:
+            message += f" {skipped} left rejected because their event is full."
+        self.message_user(request, message)
+
+    @admin.action(description="Accept selected registrations")
+    def accept_registrations(self, request, queryset):
+        self._moderate(request, queryset, accept=True)
+
+    @admin.action(description="Reject selected registrations")
+    def reject_registrations(self, request, queryset):
+        self._moderate(request, queryset, accept=False)
+
+admin.site.register(Registration, RegistrationAdmin)
+
+
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ('event', 'user', 'position', 'joined_at')
+    list_filter = ('event',)
+
+admin.site.register(WaitlistEntry, WaitlistEntryAdmin)
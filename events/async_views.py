@@ -0,0 +1,228 @@
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db.models import Max
+from django.http import Http404, JsonResponse
+from django.views import View
+from django_filters.utils import translate_validation
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.utils.encoders import JSONEncoder
+
+from .authentication import AsyncJWTAuthentication
+from .cache import aresponse_key, aversions, response_cache
+from .conditional import not_modified_response, set_validators, validators
+from .filters import EventFilter
+from .models import Event, Venue
+from .pagination import BoundedPageNumberPagination, EventPagination
+from .serializers import EventSerializer, VenueSerializer
+from .throttling import TokenBucketThrottle
+
+
+class AsyncReadView(View):
+    """
+    ``list`` and ``retrieve`` of a read endpoint as a native async view, so an
+    ASGI worker serves them without a thread per request. Mirrors the matching
+    viewset: JWT authentication, permissions, pagination, the response cache
+    and conditional GETs, and the same JSON. Routed with an optional ``pk``.
+    """
+    http_method_names = ["get", "head", "options"]
+    basename = None
+    model = None
+    serializer_class = None
+    pagination_class = BoundedPageNumberPagination
+    cache_depends_on = ()
+    validators_expire_daily = False
+    admin_only = False
+    authentication = AsyncJWTAuthentication()
+
+    async def get(self, request, pk=None):
+        self.action = "list" if pk is None else "retrieve"
+        request = Request(request)
+        try:
+            await self.authenticate(request)
+            self.check_permissions(request)
+            await self.check_throttles(request)
+            await self.validate_filters(request)
+            return await self.conditional_response(request, pk)
+        except Http404:
+            return self.error_response(request, exceptions.NotFound())
+        except exceptions.APIException as exc:
+            return self.error_response(request, exc)
+
+    async def authenticate(self, request):
+        result = await self.authentication.aauthenticate(request)
+        request.user, request.auth = result if result is not None else (AnonymousUser(), None)
+
+    def check_permissions(self, request):
+        if not self.admin_only:
+            return
+        if not request.user.is_authenticated:
+            raise exceptions.NotAuthenticated()
+        if not request.user.is_staff:
+            raise exceptions.PermissionDenied()
+
+    async def check_throttles(self, request):
+        throttle = TokenBucketThrottle()
+        if not await throttle.aallow_request(request, self):
+            raise exceptions.Throttled(throttle.wait())
+
+    async def validate_filters(self, request):
+        """Hook to check the query string before anything is read; raise ``ValidationError`` to reject it."""
+
+    def get_queryset(self, request):
+        return self.model.objects.order_by("pk")
+
+    def get_validator_querysets(self, request, pk):
+        if pk is not None:
+            return [self.model.objects.filter(pk=pk)]
+        return [self.get_queryset(request)]
+
+    def get_validator_extras(self, request):
+        return []
+
+    def cache_varies_on_user(self, request):
+        return False
+
+    async def conditional_response(self, request, pk):
+        lasts = [
+            (await queryset.order_by().aaggregate(last=Max("updated_at")))["last"]
+            for queryset in self.get_validator_querysets(request, pk)
+        ]
+        if pk is not None and lasts[0] is None:
+            raise Http404
+        extras = [*(await aversions(*self.cache_depends_on)), *self.get_validator_extras(request)]
+        etag, last_modified = validators(lasts, extras, self.validators_expire_daily, dated=pk is not None)
+
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        response = await self.cached_response(request, pk)
+        set_validators(response, etag, last_modified)
+        return response
+
+    async def cached_response(self, request, pk):
+        cache = response_cache()
+        user = request.user.pk if self.cache_varies_on_user(request) else None
+        key = await aresponse_key(request, self.basename, self.action, self.cache_depends_on, user)
+        data = await cache.aget(key)
+        if data is not None:
+            return self.render(data, headers={"X-Cache": "HIT"})
+
+        data = await (self.list(request) if pk is None else self.retrieve(request, pk))
+        await cache.aset(key, data, getattr(settings, "RESPONSE_CACHE_TIMEOUT", 300))
+        return self.render(data, headers={"X-Cache": "MISS"})
+
+    async def list(self, request):
+        queryset = self.get_queryset(request)
+        self.paginator = self.pagination_class()
+        page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+        await self.prepare(page)
+        return self.paginator.get_paginated_response(self.serializer_class(page, many=True).data).data
+
+    async def retrieve(self, request, pk):
+        try:
+            instance = await self.get_queryset(request).aget(pk=pk)
+        except self.model.DoesNotExist:
+            raise Http404
+        await self.prepare([instance])
+        return self.serializer_class(instance).data
+
+    async def prepare(self, instances):
+        """Load whatever the serializer reads from related tables."""
+
+    def render(self, data, status=status.HTTP_200_OK, headers=None):
+        return JsonResponse(
+            data, encoder=JSONEncoder, safe=False, status=status, headers=headers,
+            json_dumps_params={"ensure_ascii": False, "separators": (",", ":")},
+        )
+
+    def error_response(self, request, exc):
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail}
+        headers = None
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            headers = {"WWW-Authenticate": self.authentication.authenticate_header(request)}
+        if isinstance(exc, exceptions.Throttled) and exc.wait is not None:
+            headers = {"Retry-After": "%d" % exc.wait}
+        return self.render(data, status=exc.status_code, headers=headers)
+
+
+class AsyncEventView(AsyncReadView):
+    basename = "async-events"
+    model = Event
+    serializer_class = EventSerializer
+    pagination_class = EventPagination
+    cache_depends_on = ("event", "registration")
+    filterset = None
+    location = None
+
+    def is_personalized(self, request):
+        return (
+            self.action == "list" and request.user.is_authenticated
+            and not self.pagination_class().uses_cursor(request)
+        )
+
+    async def validate_filters(self, request):
+        # Building the filter form costs more than the rest of a cached response
+        if self.action != "list" or not any(name in request.query_params for name in EventFilter.base_filters):
+            return
+        # Same filterset and messages as EventViewSet, but the venue lookup
+        # behind ``location`` runs on the async ORM instead of in the form
+        data = request.query_params.copy()
+        location = (data.pop("location", None) or [""])[-1]
+        filterset = EventFilter(data, queryset=super().get_queryset(request), request=request)
+        errors = {} if filterset.is_valid() else translate_validation(filterset.errors).detail
+        field = filterset.filters["location"].field
+        if location not in field.empty_values:
+            try:
+                self.location = int(location)
+            except ValueError:
+                self.location = None
+            if self.location is None or not await Venue.objects.filter(pk=self.location).aexists():
+                errors["location"] = [field.error_messages["invalid_choice"]]
+        if errors:
+            raise exceptions.ValidationError(errors)
+        self.filterset = filterset
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if self.action != "list":
+            return queryset
+        if self.filterset is not None:
+            queryset = self.filterset.qs
+        if self.location is not None:
+            queryset = queryset.filter(location=self.location)
+        if self.is_personalized(request):
+            return queryset.personalized_for(request.user)
+        return queryset
+
+    def get_validator_extras(self, request):
+        return [request.user.pk] if self.is_personalized(request) else []
+
+    def cache_varies_on_user(self, request):
+        return self.is_personalized(request)
+
+
+class AsyncVenueView(AsyncReadView):
+    basename = "async-venues"
+    model = Venue
+    serializer_class = VenueSerializer
+    cache_depends_on = ("venue", "event", "registration")
+    validators_expire_daily = True
+    admin_only = True
+
+    def get_validator_querysets(self, request, pk):
+        if pk is not None:
+            venues = Venue.objects.filter(pk=pk)
+            return [venues, Event.objects.filter(location__in=venues)]
+        return [Venue.objects.all(), Event.objects.all()]
+
+    async def prepare(self, instances):
+        # Nested events and booked dates, one batched query for the whole page,
+        # cached on each venue the way prefetch_related would
+        events = {}
+        async for event in Event.objects.filter(location__in=[venue.pk for venue in instances]).order_by("pk"):
+            events.setdefault(event.location_id, []).append(event)
+        for venue in instances:
+            queryset = venue.event_set.all()
+            queryset._result_cache, queryset._prefetch_done = events.get(venue.pk, []), True
+            venue._prefetched_objects_cache = {"event_set": queryset}
@@ -0,0 +1,131 @@
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class UserCache:
+    """
+    Users by id for a few seconds, per process. Saves and deletes of a user
+    evict it here (see ``signals``); other processes, and ``QuerySet.update()``,
+    are only caught up by the TTL, so keep it short.
+    """
+
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @property
+    def ttl(self):
+        return getattr(settings, "JWT_USER_CACHE_TTL", 30)
+
+    def get(self, user_id):
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        # Each request gets its own copy to modify
+        return copy.copy(entry[1])
+
+    def set(self, user_id, user):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if len(self._entries) >= self.max_size:
+                self._entries.clear()
+            self._entries[user_id] = (time.monotonic() + self.ttl, copy.copy(user))
+
+    def _evict(self, user_id):
+        self._entries.pop(user_id, None)
+
+    def evict(self, user_id):
+        self._evict(user_id)
+        if transaction.get_connection().in_atomic_block:
+            # A concurrent request may cache the old row before the change commits
+            transaction.on_commit(lambda: self._evict(user_id))
+
+    def clear(self):
+        self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    ``JWTAuthentication`` that resolves users through ``user_cache`` instead of
+    a query per request. Views can list actions in ``token_user_actions`` that
+    only need the user's id and flags; those get a ``TokenUser`` built from the
+    token claims without touching the database or the cache.
+    """
+
+    def authenticate(self, request):
+        self.view = request.parser_context.get("view") if request.parser_context else None
+        return super().authenticate(request)
+
+    def uses_token_user(self):
+        return getattr(self.view, "action", None) in getattr(self.view, "token_user_actions", ())
+
+    def get_user(self, validated_token):
+        if self.uses_token_user():
+            if api_settings.USER_ID_CLAIM not in validated_token:
+                raise InvalidToken(_("Token contained no recognizable user identification"))
+            return api_settings.TOKEN_USER_CLASS(validated_token)
+
+        user_id = self.get_user_id(validated_token)
+        user = user_cache.get(user_id)
+        if user is None:
+            try:
+                user = self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            user_cache.set(user_id, user)
+        return self.check_user(user, validated_token)
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+    def check_user(self, user, validated_token):
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
+
+
+class AsyncJWTAuthentication(CachedJWTAuthentication):
+    """``CachedJWTAuthentication`` for async views: a cache miss is loaded with the async ORM."""
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        user = user_cache.get(user_id)
+        if user is None:
+            try:
+                user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            user_cache.set(user_id, user)
+        return self.check_user(user, validated_token)
@@ -0,0 +1,75 @@
+from bisect import bisect_right
+from datetime import date, timedelta
+
+
+class VenueCalendar:
+    """
+    Booked days of a venue stored as sorted, non-overlapping runs of
+    ``[first_ordinal, last_ordinal]``. Point lookups are a binary search and
+    range queries only touch the runs overlapping the window.
+    """
+
+    def __init__(self, ranges=()):
+        self.ranges = [tuple(run) for run in ranges]
+        self._starts = [start for start, _ in self.ranges]
+
+    @classmethod
+    def from_dates(cls, dates):
+        """Build a calendar from booked dates in ascending order."""
+        ranges = []
+        for day in dates:
+            ordinal = day.toordinal()
+            if ranges and ordinal <= ranges[-1][1] + 1:
+                ranges[-1][1] = max(ranges[-1][1], ordinal)
+            else:
+                ranges.append([ordinal, ordinal])
+        return cls(ranges)
+
+    def to_json(self):
+        return [list(run) for run in self.ranges]
+
+    def __bool__(self):
+        return bool(self.ranges)
+
+    @property
+    def last_booked(self):
+        return date.fromordinal(self.ranges[-1][1]) if self.ranges else None
+
+    def is_free(self, day):
+        ordinal = day.toordinal()
+        index = bisect_right(self._starts, ordinal) - 1
+        return index < 0 or self.ranges[index][1] < ordinal
+
+    def booked_ranges(self, start, end):
+        """Booked ``(first, last)`` date pairs clipped to ``start``..``end``."""
+        if start > end:
+            return []
+        first, last = start.toordinal(), end.toordinal()
+        index = max(bisect_right(self._starts, first) - 1, 0)
+        booked = []
+        for run_start, run_end in self.ranges[index:]:
+            if run_start > last:
+                break
+            if run_end < first:
+                continue
+            booked.append((date.fromordinal(max(run_start, first)), date.fromordinal(min(run_end, last))))
+        return booked
+
+    def free_ranges(self, start, end):
+        """Free ``(first, last)`` date pairs between ``start`` and ``end`` inclusive."""
+        if start > end:
+            return []
+        free = []
+        cursor = start
+        for booked_start, booked_end in self.booked_ranges(start, end):
+            if booked_start > cursor:
+                free.append((cursor, booked_start - timedelta(days=1)))
+            cursor = booked_end + timedelta(days=1)
+        if cursor <= end:
+            free.append((cursor, end))
+        return free
+
+    def free_days(self, start, end):
+        for first, last in self.free_ranges(start, end):
+            for offset in range((last - first).days + 1):
+                yield first + timedelta(days=offset)
@@ -0,0 +1,100 @@
+import hashlib
+from datetime import datetime, time
+
+from django.core.exceptions import ValidationError
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+
+from .cache import versions
+
+
+class ConditionalGetMixin:
+    """
+    ETag and Last-Modified for ``list`` and ``retrieve``, answered with 304
+    before the queryset is serialized (or the response cache is consulted).
+    Last-Modified is the latest ``updated_at`` of the querysets returned by
+    ``get_validator_querysets``, one ``Max`` aggregate each. The ETag also folds
+    in the cache versions of ``cache_depends_on``, which move on deletions that
+    leave the latest timestamp where it was. Lists only get the ETag: a
+    deletion or a change in personal ranking alters them without moving any
+    timestamp, so Last-Modified would answer 304 for a stale page.
+    """
+    # Set when the representation also depends on today's date
+    validators_expire_daily = False
+
+    def get_validator_querysets(self):
+        if self.action == "retrieve":
+            return [self.get_queryset().model.objects.filter(pk=self.kwargs[self.lookup_url_kwarg or self.lookup_field])]
+        return [self.filter_queryset(self.get_queryset())]
+
+    def get_validator_extras(self):
+        """Anything else the representation depends on, folded into the ETag."""
+        return []
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
+
+    def get_validators(self):
+        try:
+            lasts = [
+                queryset.order_by().aggregate(last=Max("updated_at"))["last"]
+                for queryset in self.get_validator_querysets()
+            ]
+        except (TypeError, ValueError, ValidationError):
+            # A malformed pk; let the view answer with its usual 404
+            return None, None
+        if self.action == "retrieve" and lasts[0] is None:
+            return None, None
+        extras = [*versions(*getattr(self, "cache_depends_on", ())), *self.get_validator_extras()]
+        return validators(lasts, extras, self.validators_expire_daily, dated=self.action == "retrieve")
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_validators()
+        if etag is None:
+            return handler(request, *args, **kwargs)
+
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            set_validators(response, etag, last_modified)
+        return response
+
+
+def validators(lasts, extras, expire_daily=False, dated=True):
+    """
+    The ETag and Last-Modified for the latest ``updated_at`` of some querysets.
+    Without ``dated`` Last-Modified is None and only the ETag validates.
+    """
+    timestamps = [last for last in lasts if last]
+    extras = list(extras)
+    if expire_daily:
+        timestamps.append(start_of_today())
+        extras.append(timezone.now().date().isoformat())
+
+    source = "|".join(str(part) for part in [*lasts, *extras])
+    etag = quote_etag(hashlib.md5(source.encode()).hexdigest())
+    return etag, max(timestamps, default=None) if dated else None
+
+
+def not_modified_response(request, etag, last_modified):
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+
+def set_validators(response, etag, last_modified):
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(int(last_modified.timestamp()))
+
+
+def start_of_today():
+    return timezone.make_aware(datetime.combine(timezone.now().date(), time.min))
@@ -0,0 +1,217 @@
+import csv
+import json
+from tempfile import TemporaryFile
+
+from django.http import FileResponse, StreamingHttpResponse
+from rest_framework import serializers
+
+
+EXPORT_COLUMNS = ("user_username", "event_title", "registration_date", "accepted")
+EXPORT_FIELDS = ("user__username", "event__title", "registration_date", "accepted")
+
+CHUNK_SIZE = 2000
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# format -> (content type, file extension)
+EXPORT_FORMATS = {
+    "xlsx": (XLSX_CONTENT_TYPE, "xlsx"),
+    "csv": ("text/csv", "csv"),
+    "jsonl": ("application/x-ndjson", "jsonl"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrow"),
+}
+
+
+def _values(queryset, chunk_size=CHUNK_SIZE):
+    if not queryset.ordered:
+        queryset = queryset.order_by("pk")
+    return queryset.values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+
+
+def export_rows(queryset, chunk_size=CHUNK_SIZE):
+    """
+    Yield registration export rows with the user and event joins resolved in
+    SQL, reading the queryset in chunks instead of materializing it.
+    """
+    registration_date = serializers.DateTimeField()
+    for username, title, registered_at, accepted in _values(queryset, chunk_size):
+        yield username, title, registration_date.to_representation(registered_at), accepted
+
+
+def export_columns(queryset, chunk_size=CHUNK_SIZE):
+    """Yield the export as column arrays, one chunk of ``chunk_size`` rows at a time."""
+    chunk = []
+    for row in _values(queryset, chunk_size):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield dict(zip(EXPORT_COLUMNS, zip(*chunk)))
+            chunk = []
+    if chunk:
+        yield dict(zip(EXPORT_COLUMNS, zip(*chunk)))
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows, chunk_size=CHUNK_SIZE):
+    writer = csv.writer(_Echo())
+    buffer = [writer.writerow(EXPORT_COLUMNS)]
+    for row in rows:
+        buffer.append(writer.writerow(row))
+        if len(buffer) >= chunk_size:
+            yield "".join(buffer)
+            buffer = []
+    yield "".join(buffer)
+
+
+def stream_jsonl(rows, chunk_size=CHUNK_SIZE):
+    buffer = []
+    for row in rows:
+        buffer.append(json.dumps(dict(zip(EXPORT_COLUMNS, row))) + "\n")
+        if len(buffer) >= chunk_size:
+            yield "".join(buffer)
+            buffer = []
+    yield "".join(buffer)
+
+
+def write_xlsx(rows, fileobj):
+    """
+    Write rows through an openpyxl write-only workbook. It spools the sheet to
+    disk and only assembles the zip in ``save()``, so nothing reaches
+    ``fileobj`` before the last row has been read.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(EXPORT_COLUMNS)
+    for row in rows:
+        sheet.append(row)
+    workbook.save(fileobj)
+
+
+def _arrow_batches(queryset, progress=None):
+    import pyarrow as pa
+
+    schema = pa.schema([
+        ("user_username", pa.string()),
+        ("event_title", pa.string()),
+        ("registration_date", pa.timestamp("us", tz="UTC")),
+        ("accepted", pa.bool_()),
+    ])
+    written = 0
+    for columns in export_columns(queryset):
+        batch = pa.record_batch([pa.array(columns[name], type=schema.field(name).type) for name in EXPORT_COLUMNS], schema=schema)
+        written += batch.num_rows
+        if progress:
+            progress(written)
+        yield schema, batch
+    if not written:
+        yield schema, None
+
+
+class _Chunks:
+    """Write-only file object that hands back what was written since the last ``drain()``."""
+    closed = False
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _arrow_writer(export_format, sink, schema):
+    if export_format == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.ParquetWriter(sink, schema)
+    import pyarrow as pa
+
+    return pa.ipc.new_stream(sink, schema)
+
+
+def stream_arrow(queryset, export_format, progress=None):
+    """
+    Yield a Parquet or Arrow IPC export in chunks, one record batch (a Parquet
+    row group) at a time. Both formats are written front to back, so each
+    chunk can be sent before the next one is read.
+    """
+    sink = _Chunks()
+    writer = None
+    for schema, batch in _arrow_batches(queryset, progress):
+        if writer is None:
+            writer = _arrow_writer(export_format, sink, schema)
+        if batch is not None:
+            writer.write_batch(batch)
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def _counted(rows, progress, every=CHUNK_SIZE):
+    written = 0
+    for row in rows:
+        yield row
+        written += 1
+        if progress and written % every == 0:
+            progress(written)
+    if progress:
+        progress(written)
+
+
+def write_export(queryset, export_format, fileobj, progress=None):
+    """Write the export to a binary file object, reporting rows written to ``progress``."""
+    if export_format in ("parquet", "arrow"):
+        for chunk in stream_arrow(queryset, export_format, progress):
+            fileobj.write(chunk)
+        return
+
+    rows = _counted(export_rows(queryset), progress)
+    if export_format == "xlsx":
+        return write_xlsx(rows, fileobj)
+    stream = stream_csv(rows) if export_format == "csv" else stream_jsonl(rows)
+    for chunk in stream:
+        fileobj.write(chunk.encode())
+
+
+def export_response(queryset, export_format):
+    """
+    Send the export without holding it in memory. CSV, JSON Lines, Parquet and
+    Arrow are streamed: the first chunk goes out after the first batch of rows.
+    XLSX is not; the whole workbook is written to an anonymous temporary file
+    first (see ``write_xlsx``) and sent from there.
+    """
+    content_type, extension = EXPORT_FORMATS[export_format]
+    filename = f"registrations.{extension}"
+
+    if export_format != "xlsx":
+        if export_format in ("csv", "jsonl"):
+            stream = (stream_csv if export_format == "csv" else stream_jsonl)(export_rows(queryset))
+        else:
+            stream = stream_arrow(queryset, export_format)
+        response = StreamingHttpResponse(stream, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    fileobj = TemporaryFile()
+    write_export(queryset, export_format, fileobj)
+    fileobj.seek(0)
+    return FileResponse(fileobj, as_attachment=True, filename=filename, content_type=content_type)
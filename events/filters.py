@@ -0,0 +1,86 @@
+import base64
+import binascii
+
+import django_filters
+from django import forms
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Event, Registration
+
+
+def encode_since(updated_at, pk):
+    """Opaque incremental export cursor pointing just after ``(updated_at, pk)``."""
+    return base64.urlsafe_b64encode(f"{updated_at.isoformat()}|{pk}".encode()).decode()
+
+
+def decode_since(value):
+    """
+    Accept either a cursor from ``encode_since`` or a plain ISO timestamp.
+    Returns ``(updated_at, pk)``; rows strictly after that position match.
+    """
+    try:
+        # "+" in a UTC offset arrives as a space when not URL-encoded
+        updated_at, pk = parse_datetime(value.replace(" ", "+")), 0
+    except ValueError:
+        updated_at, pk = None, 0
+    if updated_at is None:
+        try:
+            raw_updated_at, raw_pk = base64.urlsafe_b64decode(value.encode()).decode().split("|")
+            updated_at, pk = parse_datetime(raw_updated_at), int(raw_pk)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            updated_at = None
+    if updated_at is None:
+        raise ValueError("Not a timestamp or export cursor.")
+    if timezone.is_naive(updated_at):
+        updated_at = timezone.make_aware(updated_at)
+    return updated_at, pk
+
+
+class SinceField(forms.CharField):
+    def to_python(self, value):
+        value = super().to_python(value)
+        if not value:
+            return None
+        try:
+            return decode_since(value)
+        except ValueError:
+            raise forms.ValidationError("Enter an ISO timestamp or an export cursor.")
+
+
+class SinceFilter(django_filters.Filter):
+    field_class = SinceField
+
+    def filter(self, qs, value):
+        if not value:
+            return qs
+        updated_at, pk = value
+        # The leading bound lets the database seek on (updated_at, id) instead of walking the whole index
+        return qs.filter(
+            Q(updated_at__gte=updated_at),
+            Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, pk__gt=pk),
+        )
+
+
+class RegistrationExportFilter(django_filters.FilterSet):
+    registration_date = django_filters.IsoDateTimeFromToRangeFilter()
+    since = SinceFilter()
+
+    class Meta:
+        model = Registration
+        fields = ("user", "event", "accepted", "registration_date", "since")
+
+
+class RegistrationModerationFilter(django_filters.FilterSet):
+    registration_date = django_filters.IsoDateTimeFromToRangeFilter()
+
+    class Meta:
+        model = Registration
+        fields = ("user", "accepted", "rejected", "registration_date")
+
+
+class EventFilter(django_filters.FilterSet):
+    class Meta:
+        model = Event
+        fields = ("category", "date", "location")
@@ -0,0 +1,153 @@
+import csv
+import io
+import zipfile
+from datetime import datetime
+from itertools import islice
+
+from rest_framework import serializers
+
+from .models import Event, Venue, validate_future_date
+from . import cache, utils
+from .transactions import atomic_write
+
+
+IMPORT_COLUMNS = ("title", "description", "date", "time", "location", "capacity", "category")
+
+CHUNK_SIZE = 1000
+
+IMPORT_FORMATS = ("csv", "xlsx")
+
+
+class EventImportError(ValueError):
+    """
+    The file itself cannot be imported, as opposed to a single bad row. When
+    it turns unreadable partway, ``created`` and ``errors`` tell what the
+    chunks before that point did; those are committed.
+    """
+    created = 0
+    errors = ()
+
+
+class EventImportRowSerializer(serializers.Serializer):
+    # ``location`` is resolved for a whole chunk at once, by venue id or name
+    title = serializers.CharField(max_length=255)
+    description = serializers.CharField()
+    date = serializers.DateField(validators=[validate_future_date])
+    time = serializers.TimeField()
+    location = serializers.CharField()
+    capacity = serializers.IntegerField(min_value=0)
+    category = serializers.ChoiceField(choices=utils.CATEGORY_CHOICES)
+
+    def to_internal_value(self, data):
+        # Spreadsheet cells arrive as datetimes and numbers rather than strings
+        if isinstance(data.get("date"), datetime):
+            data = {**data, "date": data["date"].date()}
+        if isinstance(data.get("location"), (int, float)):
+            data = {**data, "location": str(int(data["location"]))}
+        return super().to_internal_value(data)
+
+
+def import_format(filename, requested=None):
+    file_format = (requested or filename.rsplit(".", 1)[-1]).lower()
+    if file_format not in IMPORT_FORMATS:
+        raise EventImportError(f"Unsupported format, use one of: {', '.join(IMPORT_FORMATS)}.")
+    return file_format
+
+
+def _check_header(header):
+    missing = [column for column in IMPORT_COLUMNS if column not in header]
+    if missing:
+        raise EventImportError(f"Missing columns: {', '.join(missing)}.")
+
+
+def read_csv(fileobj):
+    reader = csv.DictReader(io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline=""))
+    try:
+        _check_header(reader.fieldnames or ())
+        yield from reader
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise EventImportError(f"Unreadable CSV file: {exc}.")
+
+
+def read_xlsx(fileobj):
+    from openpyxl import load_workbook
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    try:
+        workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    except (InvalidFileException, zipfile.BadZipFile, KeyError) as exc:
+        raise EventImportError(f"Unreadable XLSX file: {exc}.")
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else "" for cell in next(rows, ())]
+        _check_header(header)
+        for values in rows:
+            if any(value is not None for value in values):
+                yield dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def read_rows(fileobj, import_format):
+    """Yield the rows of an uploaded file as dicts without loading the whole file."""
+    return read_xlsx(fileobj) if import_format == "xlsx" else read_csv(fileobj)
+
+
+def _resolve_venues(locations):
+    """Map each location value of a chunk, a venue id or name, to a venue id with one query."""
+    ids = {int(location) for location in locations if location.isdigit()}
+    names = set(locations) - {str(pk) for pk in ids}
+    venues = Venue.objects.filter(pk__in=ids) | Venue.objects.filter(name__in=names)
+    resolved = {}
+    for pk, name in venues.values_list("pk", "name"):
+        resolved[name] = pk
+        resolved[str(pk)] = pk
+    return resolved
+
+
+def import_events(rows, created_by, chunk_size=CHUNK_SIZE):
+    """
+    Validate and insert events chunk by chunk. Bad rows are reported with their
+    line number (the header is line 1) and skipped; the rest of the file is
+    still imported. Returns ``(created, errors)``. Each chunk commits on its
+    own, so an ``EventImportError`` from a file that cannot be read to the end
+    carries the outcome of the chunks already saved.
+    """
+    created, errors = 0, []
+    rows = enumerate(rows, start=2)
+    try:
+        while chunk := list(islice(rows, chunk_size)):
+            created += _import_chunk(chunk, created_by, errors)
+    except EventImportError as exc:
+        exc.created, exc.errors = created, sorted(errors, key=lambda error: error["row"])
+        raise
+
+    errors.sort(key=lambda error: error["row"])
+    return created, errors
+
+
+def _import_chunk(chunk, created_by, errors):
+    valid = []
+    for line, row in chunk:
+        serializer = EventImportRowSerializer(data=row)
+        if serializer.is_valid():
+            valid.append((line, serializer.validated_data))
+        else:
+            errors.append({"row": line, "errors": serializer.errors})
+
+    venues = _resolve_venues({data["location"] for _, data in valid})
+    events = []
+    for line, data in valid:
+        location = data.pop("location")
+        if location not in venues:
+            errors.append({"row": line, "errors": {"location": [f'Unknown venue "{location}".']}})
+            continue
+        events.append(Event(location_id=venues[location], created_by=created_by, **data))
+
+    with atomic_write():
+        Event.objects.bulk_create(events)
+        # bulk_create skips the post_save signals that keep venue calendars and cached responses current
+        Venue.refresh_calendars(event.location_id for event in events)
+        if events:
+            cache.bump('event')
+    return len(events)
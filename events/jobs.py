@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from threading import Lock
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+from django_filters.widgets import SuffixedMultiWidget
+from rest_framework.exceptions import ValidationError
+
+from . import exports
+from .filters import RegistrationExportFilter
+from .models import ExportJob, Registration
+from .transactions import atomic_write
+
+
+_executor = None
+_executor_lock = Lock()
+
+
+def storage_dir():
+    path = Path(settings.EXPORT_STORAGE_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def artifact_path(job):
+    return storage_dir() / job.file_name
+
+
+def export_fingerprint(params):
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+
+def export_queryset(params):
+    return RegistrationExportFilter(data=params, queryset=Registration.objects.all()).qs
+
+
+def query_param_names(filterset):
+    """The query parameters the filters read; range filters read one per bound."""
+    for name, field in filterset.form.fields.items():
+        widget = field.widget
+        if isinstance(widget, SuffixedMultiWidget):
+            yield from (widget.suffixed(name, suffix) for suffix in widget.suffixes)
+        else:
+            yield name
+
+
+def clean_params(data):
+    """Validate export filters and normalize them so equal filter sets share a fingerprint."""
+    filterset = RegistrationExportFilter(data=data, queryset=Registration.objects.none())
+    if not filterset.is_valid():
+        raise ValidationError(filterset.errors)
+    params = {name: str(data[name]) for name in query_param_names(filterset) if data.get(name) not in (None, "")}
+
+    export_format = data.get("format") or "xlsx"
+    if export_format not in exports.EXPORT_FORMATS:
+        raise ValidationError({"format": [f"Choose one of: {', '.join(exports.EXPORT_FORMATS)}."]})
+    params["format"] = export_format
+    return params
+
+
+def get_or_create_job(params, user):
+    """
+    Reuse an up-to-date job for the same filters, otherwise queue a new one.
+    Jobs whose worker went quiet are failed first so they are not waited on
+    forever. Returns ``(job, created)``.
+    """
+    fingerprint = export_fingerprint(params)
+    ExportJob.objects.filter(fingerprint=fingerprint).expire()
+    job = ExportJob.objects.reusable(fingerprint).order_by("-created_at").first()
+    if job is not None:
+        return job, False
+
+    # Outdated artifacts for these filters are superseded by the new job
+    for stale_job in ExportJob.objects.filter(fingerprint=fingerprint, status__in=(ExportJob.DONE, ExportJob.FAILED)):
+        remove_artifact(stale_job)
+        stale_job.delete()
+
+    try:
+        with atomic_write():
+            job = ExportJob.objects.create(created_by=user, params=params, fingerprint=fingerprint)
+    except IntegrityError:
+        # A concurrent request queued the same filters first; the constraint allows one live job
+        return ExportJob.objects.reusable(fingerprint).get(), False
+    submit(job)
+    job.refresh_from_db()
+    return job, True
+
+
+def remove_artifact(job):
+    if job.file_name:
+        try:
+            os.remove(artifact_path(job))
+        except FileNotFoundError:
+            pass
+
+
+def submit(job):
+    if settings.EXPORT_JOBS_EAGER:
+        run_export_job(job.pk)
+        return
+    transaction.on_commit(lambda: _get_executor().submit(_run_in_worker, job.pk))
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.EXPORT_JOB_WORKERS, thread_name_prefix="registration-export"
+            )
+        return _executor
+
+
+def _run_in_worker(job_id):
+    close_old_connections()
+    try:
+        run_export_job(job_id)
+    finally:
+        close_old_connections()
+
+
+def run_export_job(job_id):
+    job = ExportJob.objects.get(pk=job_id)
+    queryset = export_queryset(job.params)
+    started = ExportJob.objects.filter(pk=job.pk, status=ExportJob.PENDING).update(
+        status=ExportJob.RUNNING, rows_total=queryset.count(), heartbeat_at=timezone.now()
+    )
+    if not started:
+        # Given up on while it waited for a worker
+        return
+
+    _, extension = exports.EXPORT_FORMATS[job.export_format]
+    job.file_name = f"{job.pk}.{extension}"
+    path = artifact_path(job)
+    partial_path = path.with_suffix(".partial")
+    try:
+        with open(partial_path, "wb") as fileobj:
+            exports.write_export(
+                queryset,
+                job.export_format,
+                fileobj,
+                progress=lambda written: ExportJob.objects.filter(pk=job.pk).update(
+                    rows_written=written, heartbeat_at=timezone.now()
+                ),
+            )
+        os.replace(partial_path, path)
+    except Exception as exc:
+        if partial_path.exists():
+            partial_path.unlink()
+        ExportJob.objects.filter(pk=job.pk, status=ExportJob.RUNNING).update(
+            status=ExportJob.FAILED, error=str(exc), finished_at=timezone.now()
+        )
+        return
+
+    finished = ExportJob.objects.filter(pk=job.pk, status=ExportJob.RUNNING).update(
+        status=ExportJob.DONE, file_name=job.file_name, finished_at=timezone.now()
+    )
+    if not finished:
+        # Expired while it ran; a newer job owns these filters now
+        os.remove(path)
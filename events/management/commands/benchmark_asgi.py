@@ -0,0 +1,102 @@
+import asyncio
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare read throughput of the sync views behind a threaded WSGI server with the "
+        "async views under ASGI, for many concurrent slow clients. Runs in process against "
+        "the configured database, which should already hold some events."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=500, help="Concurrent clients")
+        parser.add_argument("--requests", type=int, default=2000, help="Requests per run")
+        parser.add_argument("--threads", type=int, default=32, help="WSGI worker threads")
+        parser.add_argument(
+            "--latency", type=float, default=0.5,
+            help="Seconds each client takes to send its request and again to read the response",
+        )
+        parser.add_argument("--path", default="/api/events/", help="Sync endpoint; the async one is under /api/async/")
+
+    def handle(self, *args, **options):
+        sync_path = options["path"]
+        async_path = sync_path.replace("/api/", "/api/async/", 1)
+        runs = (
+            ("WSGI, sync views", self.run_wsgi, sync_path),
+            ("ASGI, sync views", self.run_asgi, sync_path),
+            ("ASGI, async views", self.run_asgi, async_path),
+        )
+        for label, run, path in runs:
+            started = time.perf_counter()
+            statuses = run(path, options)
+            elapsed = time.perf_counter() - started
+            failed = sum(1 for code in statuses if code != 200)
+            self.stdout.write(
+                f"{label:<18} {path:<22} {len(statuses) / elapsed:8.1f} req/s  {failed} non-200 responses"
+            )
+
+    def run_wsgi(self, path, options):
+        application = WSGIHandler()
+        latency = options["latency"]
+
+        def request(_):
+            time.sleep(latency)  # the client is still sending; a worker thread is held
+            status = []
+            environ = {
+                "REQUEST_METHOD": "GET", "PATH_INFO": path, "QUERY_STRING": "", "SCRIPT_NAME": "",
+                "SERVER_NAME": "testserver", "SERVER_PORT": "80", "SERVER_PROTOCOL": "HTTP/1.1",
+                "wsgi.input": io.BytesIO(), "wsgi.errors": io.StringIO(), "wsgi.url_scheme": "http",
+            }
+            response = application(environ, lambda code, headers: status.append(int(code.split()[0])))
+            for _ in response:
+                time.sleep(latency)  # a slow download, still on the worker thread
+            response.close()
+            return status[0]
+
+        with ThreadPoolExecutor(max_workers=options["threads"]) as pool:
+            return list(pool.map(request, range(options["requests"])))
+
+    def run_asgi(self, path, options):
+        application = ASGIHandler()
+        latency = options["latency"]
+
+        async def request(slots):
+            async with slots:
+                status = []
+                sent = False
+                scope = {
+                    "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+                    "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+                    "root_path": "", "headers": [(b"host", b"testserver")], "server": ("testserver", 80),
+                }
+
+                async def receive():
+                    nonlocal sent
+                    if sent:
+                        # Nothing more to read; wait like a client keeping the connection open
+                        await asyncio.sleep(3600)
+                    sent = True
+                    await asyncio.sleep(latency)  # a slow upload only parks a coroutine
+                    return {"type": "http.request", "body": b"", "more_body": False}
+
+                async def send(message):
+                    if message["type"] == "http.response.start":
+                        status.append(message["status"])
+                    elif not message.get("more_body"):
+                        await asyncio.sleep(latency)
+
+                await application(scope, receive, send)
+                return status[0]
+
+        async def run():
+            slots = asyncio.Semaphore(options["clients"])
+            return await asyncio.gather(*(request(slots) for _ in range(options["requests"])))
+
+        return asyncio.run(run())
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from events.models import Event, User, Venue
+from events.utils import CATEGORY_CHOICES
+
+
+class Command(BaseCommand):
+    help = (
+        "Time POST /api/registrations/bulk/ with a full payload against the configured "
+        "database. The users, event and registrations it creates are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--items", type=int, default=10000)
+        parser.add_argument("--runs", type=int, default=3)
+
+    def handle(self, *args, **options):
+        items = options["items"]
+        with transaction.atomic():
+            admin = User.objects.create(username="benchmark-admin", is_staff=True, is_superuser=True)
+            users = User.objects.bulk_create([User(username=f"benchmark-{i}") for i in range(items)])
+            venue = Venue.objects.create(name="Benchmark Venue", capacity=items, amenities="")
+            event = Event.objects.create(
+                title="Benchmark Event",
+                description="",
+                date=timezone.now().date() + timezone.timedelta(days=2),
+                time=timezone.now().time(),
+                location=venue,
+                capacity=items,
+                category=CATEGORY_CHOICES[0][0],
+                created_by=admin,
+            )
+            payload = [{"user": user.pk, "event": event.pk} for user in users]
+            client = APIClient()
+            client.force_authenticate(user=admin)
+
+            for run in range(options["runs"]):
+                savepoint = transaction.savepoint()
+                started = time.perf_counter()
+                response = client.post(reverse("registrations-bulk"), payload, format="json")
+                elapsed = time.perf_counter() - started
+                transaction.savepoint_rollback(savepoint)
+                self.stdout.write(f"run {run + 1}: {items} items in {elapsed:.3f}s ({response.status_code})")
+            transaction.set_rollback(True)
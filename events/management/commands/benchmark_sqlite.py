@@ -0,0 +1,98 @@
+import os
+import tempfile
+import threading
+import time
+from copy import deepcopy
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections
+
+from events.transactions import atomic_write
+
+
+class Command(BaseCommand):
+    help = (
+        "Race concurrent readers and read-then-write transactions against a scratch "
+        "SQLite file, with the stock backend and with the configured connection settings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--writers", type=int, default=8)
+        parser.add_argument("--readers", type=int, default=8)
+        parser.add_argument("--seconds", type=float, default=5.0)
+        parser.add_argument("--rows", type=int, default=100)
+
+    def handle(self, *args, **options):
+        default = connections["default"].settings_dict
+        if default["ENGINE"] != "EventManagementApp.sqlite3":
+            raise CommandError("The default database does not use the tuned SQLite backend.")
+
+        stock = {"ENGINE": "django.db.backends.sqlite3", "OPTIONS": {}}
+        tuned = {"ENGINE": default["ENGINE"], "OPTIONS": default["OPTIONS"]}
+        for label, overrides in (("stock", stock), ("tuned", tuned)):
+            with tempfile.TemporaryDirectory() as directory:
+                alias = f"benchmark_{label}"
+                connections.settings[alias] = {
+                    **deepcopy(default), **deepcopy(overrides), "NAME": os.path.join(directory, "benchmark.sqlite3"),
+                }
+                try:
+                    results = self.run(alias, options)
+                finally:
+                    del connections.settings[alias]
+            seconds = options["seconds"]
+            self.stdout.write(
+                f"{label:>6}: {results['writes'] / seconds:8.1f} writes/s  {results['reads'] / seconds:8.1f} reads/s  "
+                f"{results['locked']:6d} 'database is locked' errors"
+            )
+
+    def run(self, alias, options):
+        with connections[alias].cursor() as cursor:
+            cursor.execute("CREATE TABLE seat (id INTEGER PRIMARY KEY, taken INTEGER NOT NULL)")
+            cursor.executemany("INSERT INTO seat (id, taken) VALUES (%s, 0)", [(i,) for i in range(options["rows"])])
+        connections[alias].close()
+
+        results = {"writes": 0, "reads": 0, "locked": 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + options["seconds"]
+
+        def count(key):
+            with lock:
+                results[key] += 1
+
+        def write(worker):
+            i = worker
+            while time.monotonic() < deadline:
+                i = (i + options["writers"]) % options["rows"]
+                try:
+                    # The shape of a registration: check, then take a seat
+                    with atomic_write(using=alias), connections[alias].cursor() as cursor:
+                        cursor.execute("SELECT taken FROM seat WHERE id = %s", [i])
+                        cursor.fetchone()
+                        cursor.execute("UPDATE seat SET taken = taken + 1 WHERE id = %s", [i])
+                    count("writes")
+                except OperationalError:
+                    count("locked")
+
+        def read(worker):
+            while time.monotonic() < deadline:
+                try:
+                    with connections[alias].cursor() as cursor:
+                        cursor.execute("SELECT SUM(taken) FROM seat")
+                        cursor.fetchone()
+                    count("reads")
+                except OperationalError:
+                    count("locked")
+
+        def worker(target, number):
+            try:
+                target(number)
+            finally:
+                connections[alias].close()
+
+        threads = [threading.Thread(target=worker, args=(write, n)) for n in range(options["writers"])]
+        threads += [threading.Thread(target=worker, args=(read, n)) for n in range(options["readers"])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
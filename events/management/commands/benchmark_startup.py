@@ -0,0 +1,22 @@
+from statistics import median
+
+from django.core.management.base import BaseCommand
+
+from events.startup import measure_startup
+
+
+class Command(BaseCommand):
+    help = "Measure worker boot: django.setup() plus the URLConf import, in fresh interpreters."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5)
+
+    def handle(self, *args, **options):
+        runs = [measure_startup() for _ in range(options["runs"])]
+        self.stdout.write(
+            f"startup: median {median(run['seconds'] for run in runs) * 1000:.0f} ms, "
+            f"best {min(run['seconds'] for run in runs) * 1000:.0f} ms over {len(runs)} runs"
+        )
+        self.stdout.write(f"peak RSS: {max(run['peak_rss_mb'] for run in runs):.1f} MB")
+        heavy = sorted({name for run in runs for name in run["heavy_modules"]})
+        self.stdout.write(f"heavy modules loaded: {', '.join(heavy) or 'none'}")
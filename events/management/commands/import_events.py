@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from events import imports
+from events.models import User
+
+
+class Command(BaseCommand):
+    help = "Import events from a CSV or XLSX file, skipping and reporting invalid rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--user", required=True, help="Username recorded as the creator of the events")
+        parser.add_argument("--format", choices=imports.IMPORT_FORMATS, help="Defaults to the file extension")
+        parser.add_argument("--chunk-size", type=int, default=imports.CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options["user"])
+        except User.DoesNotExist:
+            raise CommandError(f'Unknown user "{options["user"]}".')
+
+        try:
+            file_format = imports.import_format(options["path"], options["format"])
+            with open(options["path"], "rb") as fileobj:
+                created, errors = imports.import_events(
+                    imports.read_rows(fileobj, file_format), user, chunk_size=options["chunk_size"]
+                )
+        except (OSError, imports.EventImportError) as exc:
+            raise CommandError(str(exc))
+
+        for error in errors:
+            details = "; ".join(f"{field}: {' '.join(map(str, messages))}" for field, messages in error["errors"].items())
+            self.stderr.write(f"Row {error['row']}: {details}")
+        self.stdout.write(self.style.SUCCESS(f"Imported {created} events, skipped {len(errors)} rows."))
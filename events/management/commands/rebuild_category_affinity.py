@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from events.models import CategoryAffinity
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-user category affinity table from accepted registrations."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, action="append", dest="user_ids", help="Only rebuild these user ids")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        created = CategoryAffinity.objects.rebuild(
+            user_ids=options["user_ids"], batch_size=options["batch_size"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {created} category affinity rows."))
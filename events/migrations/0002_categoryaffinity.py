@@ -0,0 +1,45 @@
+# Generated by Django 4.2.5 on 2026-10-17 20:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_affinity(apps, schema_editor):
+    Registration = apps.get_model('events', 'Registration')
+    CategoryAffinity = apps.get_model('events', 'CategoryAffinity')
+    weights = (
+        Registration.objects.filter(accepted=True)
+        .order_by()
+        .values_list('user_id', 'event__category')
+        .annotate(weight=models.Count('pk'))
+    )
+    CategoryAffinity.objects.bulk_create(
+        [CategoryAffinity(user_id=user_id, category=category, weight=weight) for user_id, category, weight in weights],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryAffinity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(choices=[('Concerts', 'Concerts'), ('Conferences', 'Conferences'), ('Workshops', 'Workshops'), ('Seminars', 'Seminars'), ('Webinars', 'Webinars'), ('Sports', 'Sports'), ('Exhibitions', 'Exhibitions'), ('Meetups', 'Meetups'), ('Networking', 'Networking'), ('Parties', 'Parties'), ('Festivals', 'Festivals'), ('Charity', 'Charity'), ('Arts & Culture', 'Arts & Culture'), ('Education', 'Education'), ('Technology', 'Technology'), ('Food & Drink', 'Food & Drink'), ('Health & Wellness', 'Health & Wellness'), ('Family & Kids', 'Family & Kids'), ('Other', 'Other')], max_length=255)),
+                ('weight', models.PositiveIntegerField(default=0, help_text='Accepted registrations in this category')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'category affinities',
+                'unique_together': {('user', 'category')},
+            },
+        ),
+        migrations.RunPython(backfill_affinity, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.5 on 2026-10-17 20:08
+
+from django.db import migrations, models
+
+from events.availability import VenueCalendar
+
+
+def backfill_booked_ranges(apps, schema_editor):
+    Venue = apps.get_model('events', 'Venue')
+    Event = apps.get_model('events', 'Event')
+    for venue in Venue.objects.all():
+        dates = Event.objects.filter(location=venue).order_by('date').values_list('date', flat=True).distinct()
+        venue.booked_ranges = VenueCalendar.from_dates(dates).to_json()
+        venue.save(update_fields=['booked_ranges'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0002_categoryaffinity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='venue',
+            name='booked_ranges',
+            field=models.JSONField(default=list, editable=False, help_text='Booked days as [first, last] ordinal runs'),
+        ),
+        migrations.RunPython(backfill_booked_ranges, migrations.RunPython.noop),
+    ]
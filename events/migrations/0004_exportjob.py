@@ -0,0 +1,33 @@
+# Generated by Django 4.2.5 on 2026-10-17 20:14
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0003_venue_booked_ranges'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('params', models.JSONField(default=dict, help_text='Normalized export filters')),
+                ('fingerprint', models.CharField(db_index=True, max_length=64)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=16)),
+                ('rows_total', models.PositiveIntegerField(default=0)),
+                ('rows_written', models.PositiveIntegerField(default=0)),
+                ('file_name', models.CharField(blank=True, max_length=255)),
+                ('error', models.TextField(blank=True)),
+                ('stale', models.BooleanField(default=False, help_text='Registrations changed after this job started')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def backfill_updated_at(apps, schema_editor):
+    Registration = apps.get_model('events', 'Registration')
+    Registration.objects.update(updated_at=models.F('registration_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0004_exportjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='registration',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='registration',
+            index=models.Index(fields=['updated_at', 'id'], name='registration_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.5 on 2026-10-17 20:20
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_registered_count(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    Registration = apps.get_model('events', 'Registration')
+    seats = (
+        Registration.objects.filter(event=models.OuterRef('pk'), rejected=False)
+        .order_by().values('event').annotate(count=models.Count('pk')).values('count')
+    )
+    Event.objects.update(registered_count=Coalesce(models.Subquery(seats), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0005_registration_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='registered_count',
+            field=models.PositiveIntegerField(default=0, help_text='Seats held by registrations that are not rejected'),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='rejected',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(backfill_registered_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.5 on 2026-10-17 20:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_waitlistentry'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['date', 'time', 'id'], name='event_date_time_idx'),
+        ),
+    ]
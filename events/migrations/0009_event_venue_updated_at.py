@@ -0,0 +1,27 @@
+# Generated by Django 4.2.5 on 2026-10-17 20:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0008_event_date_time_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='venue',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['updated_at'], name='event_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.5 on 2026-10-17 21:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0009_event_venue_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['category', 'date'], name='event_category_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['location', 'date'], name='event_location_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registration',
+            index=models.Index(fields=['user', 'accepted'], name='registration_user_acc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registration',
+            index=models.Index(fields=['event', 'accepted'], name='registration_event_acc_idx'),
+        ),
+    ]
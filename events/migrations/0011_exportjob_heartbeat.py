@@ -0,0 +1,35 @@
+# Generated by Django 4.2.5 on 2026-10-17 21:56
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def retire_duplicate_jobs(apps, schema_editor):
+    # Keep the newest live job of each filter set; older duplicates would break the constraint
+    ExportJob = apps.get_model('events', 'ExportJob')
+    live = ExportJob.objects.filter(stale=False, status__in=('pending', 'running', 'done'))
+    seen = set()
+    for job_id, fingerprint in live.order_by('-created_at').values_list('id', 'fingerprint'):
+        if fingerprint in seen:
+            ExportJob.objects.filter(pk=job_id).update(stale=True)
+        seen.add(fingerprint)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0010_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='Last progress report of the worker'),
+        ),
+        migrations.RunPython(retire_duplicate_jobs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='exportjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('stale', False), ('status__in', ('pending', 'running', 'done'))), fields=('fingerprint',), name='exportjob_live_fingerprint_uniq'),
+        ),
+    ]
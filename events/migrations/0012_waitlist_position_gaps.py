@@ -0,0 +1,18 @@
+# Generated by Django 4.2.5 on 2026-10-17 22:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0011_exportjob_heartbeat'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='waitlistentry',
+            name='position',
+            field=models.PositiveBigIntegerField(help_text='Order in the event queue; departures leave gaps'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.5 on 2026-10-17 22:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def renumber_queues(apps, schema_editor):
+    # Ranks now assume every removal is recorded, so restart each queue at 1 with no gaps
+    WaitlistEntry = apps.get_model('events', 'WaitlistEntry')
+    entries = WaitlistEntry.objects.order_by('event_id', 'position').only('event_id', 'position')
+    changed, event_id, position = [], None, 0
+    for entry in entries.iterator():
+        position = position + 1 if entry.event_id == event_id else 1
+        event_id = entry.event_id
+        if entry.position != position:
+            entry.position = position
+            changed.append(entry)
+    WaitlistEntry.objects.bulk_update(changed, ['position'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0012_waitlist_position_gaps'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistDeparture',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('node', models.PositiveBigIntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='events.event')),
+            ],
+            options={
+                'unique_together': {('event', 'node')},
+            },
+        ),
+        migrations.AlterField(
+            model_name='waitlistentry',
+            name='position',
+            field=models.PositiveBigIntegerField(help_text='Order in the event queue, never reused; see WaitlistDeparture'),
+        ),
+        migrations.RunPython(renumber_queues, migrations.RunPython.noop),
+    ]
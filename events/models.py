@@ -1,11 +1,20 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, connections, IntegrityError
+from django.db.models import Count, Exists, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 
-from datetime import timedelta
+import uuid
+from collections import Counter
+from functools import reduce
+from operator import or_
 
 from . import utils
+from .availability import VenueCalendar
+from . import cache
+from .transactions import atomic_write
 
 class User(AbstractUser):
     def __str__(self):
@@ -15,35 +24,106 @@ class Venue(models.Model):
     name = models.CharField(max_length=255, unique=True, help_text="Venue Name")
     capacity = models.PositiveIntegerField(default=0, help_text="Venue Capacity")
     amenities = models.TextField(help_text="Amenities available at Venue")
+    booked_ranges = models.JSONField(default=list, editable=False, help_text="Booked days as [first, last] ordinal runs")
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
+
+    def save(self, *args, **kwargs):
+        # The calendar only changes through refresh_calendars, never write back a stale copy
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'booked_ranges'
+            ]
+        super().save(*args, **kwargs)
     
     def get_all_events(self):
         return self.event_set.filter(date__gte=timezone.now().date())
 
     def get_booked_dates(self):
-        return Event.objects.filter(location=self).values_list('date', flat=True).distinct()
+        # Reuse events prefetched for a whole page of venues when available
+        events = getattr(self, '_prefetched_objects_cache', {}).get('event_set')
+        if events is not None:
+            return sorted({event.date for event in events})
+        return Event.objects.filter(location=self).order_by('date').values_list('date', flat=True).distinct()
+
+    @property
+    def calendar(self):
+        return VenueCalendar(self.booked_ranges)
+
+    @classmethod
+    def refresh_calendars(cls, venue_ids):
+        """Recompute the stored booking calendar of the given venues."""
+        for venue_id in set(venue_ids):
+            dates = (
+                Event.objects.filter(location_id=venue_id)
+                .order_by('date').values_list('date', flat=True).distinct()
+            )
+            cls.objects.filter(pk=venue_id).update(
+                booked_ranges=VenueCalendar.from_dates(dates).to_json(), updated_at=timezone.now()
+            )
 
     def get_available_dates(self):
-        event_dates = set(self.get_booked_dates())
-        
+        calendar = self.calendar
+
         # if no booked dates return empty array else max() will bring error
-        if not event_dates: return ["No bookings"]
-        
-        available_dates = []
-        current_date = timezone.now().date()
-        while current_date <= max(event_dates):
-            if current_date not in event_dates:
-                available_dates.append(current_date)
-            current_date += timedelta(days=1)
+        if not calendar: return ["No bookings"]
 
-        return available_dates
+        return list(calendar.free_days(timezone.now().date(), calendar.last_booked))
 
 
 def validate_future_date(value):
     if value < timezone.now().date() + timezone.timedelta(days=1):
         raise ValidationError("Event date must be in the future.")
+
+
+class EventQuerySet(models.QuerySet):
+    def personalized_for(self, user):
+        # Events from categories the user attended come first, resolved in SQL
+        # so only the requested page is ever fetched.
+        attended = CategoryAffinity.objects.filter(user_id=user.pk, category=OuterRef('category'))
+        return self.annotate(preferred=Exists(attended)).order_by('-preferred', 'pk')
+
+    def reserve_seats(self, event_id, count=1):
+        """
+        Atomically take ``count`` seats if they are still free. The check and the
+        increment are a single conditional UPDATE, so concurrent registrations
+        can never oversell and no application-level lock is held.
+        """
+        if count <= 0:
+            return True
+        return bool(
+            self.filter(pk=event_id, registered_count__lte=F('capacity') - count)
+            .update(registered_count=F('registered_count') + count, updated_at=timezone.now())
+        )
+
+    def release_seats(self, event_id, count=1):
+        if count <= 0:
+            return
+        self.filter(pk=event_id, registered_count__gte=count).update(
+            registered_count=F('registered_count') - count, updated_at=timezone.now()
+        )
+
+    def reserve_available_seats(self, event_id, count):
+        """Take up to ``count`` seats, as many as are still free. Returns the number taken."""
+        self.lock(event_id)
+        seats = self.filter(pk=event_id).values_list('capacity', 'registered_count').first()
+        granted = min(count, max(seats[0] - seats[1], 0)) if seats else 0
+        if granted and not self.reserve_seats(event_id, granted):
+            return 0
+        return granted
+
+    def lock(self, *event_ids):
+        """
+        Serialize seat and waitlist changes of the given events until the
+        transaction ends. Several events are locked in pk order, so two callers
+        can never each hold one the other waits for.
+        """
+        return list(self.select_for_update().filter(pk__in=event_ids).order_by('pk').values_list('pk', flat=True))
+
+
 class Event(models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField()
@@ -53,18 +133,542 @@ class Event(models.Model):
     capacity = models.PositiveIntegerField()
     category = models.CharField(max_length=255, choices=utils.CATEGORY_CHOICES)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE)
+    registered_count = models.PositiveIntegerField(default=0, help_text="Seats held by registrations that are not rejected")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = EventQuerySet.as_manager()
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # The seat counter only changes through atomic UPDATEs, never write back a stale copy
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'registered_count'
+            ]
+        super().save(*args, **kwargs)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination order of the event catalogue
+            models.Index(fields=['date', 'time', 'id'], name='event_date_time_idx'),
+            # Latest change for conditional GETs
+            models.Index(fields=['updated_at'], name='event_updated_idx'),
+            models.Index(fields=['category', 'date'], name='event_category_date_idx'),
+            models.Index(fields=['location', 'date'], name='event_location_date_idx'),
+        ]
+
+
+class EventFull(ValidationError):
+    pass
+
+
+class RegistrationQuerySet(models.QuerySet):
+    def moderate(self, accept):
+        """
+        Accept or reject every registration in the queryset with a single UPDATE
+        and do the seat, waitlist, affinity and export bookkeeping per event
+        instead of per row. Rejected registrations only come back while their
+        event has free seats. Returns ``(updated, skipped_for_lack_of_seats)``.
+        """
+        skipped = 0
+        with atomic_write():
+            rows = self.filter(accepted=False) if accept else self.filter(rejected=False)
+            # Events before registrations, the order Registration.save takes them in
+            event_ids = list(
+                Event.objects.select_for_update().filter(pk__in=rows.values('event_id'))
+                .order_by('pk').values_list('pk', flat=True)
+            )
+            rows = list(
+                rows.filter(event__in=event_ids).select_for_update(of=('self',)).order_by('pk')
+                .values_list('pk', 'user_id', 'event_id', 'event__category', 'accepted', 'rejected')
+            )
+
+            by_event = {}
+            for row in rows:
+                by_event.setdefault(row[2], []).append(row)
+
+            changed = []
+            for event_id, event_rows in by_event.items():
+                if accept:
+                    needing_seats = [row for row in event_rows if row[5]]
+                    granted = Event.objects.reserve_available_seats(event_id, len(needing_seats)) if needing_seats else 0
+                    skipped += len(needing_seats) - granted
+                    left_out = {row[0] for row in needing_seats[granted:]}
+                    event_rows = [row for row in event_rows if row[0] not in left_out]
+                else:
+                    Event.objects.release_seats(event_id, len(event_rows))
+                changed += event_rows
+
+            if accept:
+                values = dict(accepted=True, rejected=False)
+            else:
+                values = dict(accepted=False, rejected=True)
+            updated = Registration.objects.filter(pk__in=[row[0] for row in changed]).update(updated_at=timezone.now(), **values)
+
+            affinity = {}
+            for _, user_id, _, category, was_accepted, _ in changed:
+                if was_accepted != accept:
+                    affinity.setdefault(category, []).append(user_id)
+            for category, user_ids in affinity.items():
+                CategoryAffinity.objects.bulk_adjust(user_ids, category, 1 if accept else -1)
+
+            if not accept:
+                for event_id in by_event:
+                    WaitlistEntry.objects.promote(event_id)
+            if updated:
+                ExportJob.objects.invalidate()
+                cache.bump('registration')
+        return updated, skipped
+
+    def bulk_register(self, pairs):
+        """
+        Register many ``(user_id, event_id)`` pairs at once. Existing rows are
+        checked with a single query and the new ones inserted with ``_insert_pairs``.
+        Returns one result per pair: the id of the created registration or a
+        dict of field errors. Seats go to the earliest pairs of each event.
+        """
+        pairs = list(pairs)
+        results = [None] * len(pairs)
+        user_ids = {user_id for user_id, _ in pairs}
+        event_ids = {event_id for _, event_id in pairs}
+        known_users = set(User.objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+        known_events = set(Event.objects.filter(pk__in=event_ids).values_list('pk', flat=True))
+        taken = set(self.filter(user__in=user_ids, event__in=event_ids).values_list('user_id', 'event_id'))
+
+        pending = {}
+        for index, (user_id, event_id) in enumerate(pairs):
+            if user_id not in known_users:
+                results[index] = {'user': [f'Invalid pk "{user_id}" - object does not exist.']}
+            elif event_id not in known_events:
+                results[index] = {'event': [f'Invalid pk "{event_id}" - object does not exist.']}
+            elif (user_id, event_id) in taken:
+                results[index] = {'event': ['You are already registered for this event.']}
+            else:
+                taken.add((user_id, event_id))
+                pending.setdefault(event_id, []).append(index)
+
+        with atomic_write():
+            indexes = []
+            for event_id, waiting in pending.items():
+                granted = Event.objects.reserve_available_seats(event_id, len(waiting))
+                for index in waiting[granted:]:
+                    results[index] = {'event': ['Event is full.']}
+                indexes += waiting[:granted]
+
+            created = self._insert_pairs([pairs[index] for index in indexes])
+            for index, registration_id in zip(indexes, created):
+                results[index] = registration_id
+            if created:
+                ExportJob.objects.invalidate()
+                cache.bump('registration')
+        return results
+
+
+    def _insert_pairs(self, pairs):
+        """
+        Insert new registrations for ``(user_id, event_id)`` pairs with a single
+        executemany and return their ids, read back in one query. bulk_create
+        would compile every value of every row through the ORM and build a model
+        instance per row, which dominates at thousands of rows. Like
+        bulk_create, no signals are sent.
+        """
+        if not pairs:
+            return []
+        connection = connections[self.db]
+        opts = self.model._meta
+        now = timezone.now()
+        fields = [opts.get_field(name) for name in ('user', 'event', 'registration_date', 'accepted', 'rejected', 'updated_at')]
+        # Everything but the pair is the same for every row, so it is prepared once
+        shared = [field.get_db_prep_save(value, connection) for field, value in zip(fields[2:], (now, False, False, now))]
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            connection.ops.quote_name(opts.db_table),
+            ', '.join(connection.ops.quote_name(field.column) for field in fields),
+            ', '.join(['%s'] * len(fields)),
+        )
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, [(user_id, event_id, *shared) for user_id, event_id in pairs])
+
+        # The rows share their updated_at, so the (updated_at, id) index finds them in one seek
+        ids = dict(
+            ((user_id, event_id), pk) for pk, user_id, event_id in
+            self.filter(updated_at=now).values_list('pk', 'user_id', 'event_id')
+        )
+        return [ids[pair] for pair in pairs]
+
+
 class Registration(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     event = models.ForeignKey(Event, on_delete=models.CASCADE)
     registration_date = models.DateTimeField(auto_now_add=True)
     accepted = models.BooleanField(default=False)
+    rejected = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = RegistrationQuerySet.as_manager()
 
     def __str__(self):
         return f"{self.user.username} - {self.event.title}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored state so seat and affinity bookkeeping can detect transitions
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    @property
+    def holds_seat(self):
+        return not self.rejected
+
+    def stored_values(self):
+        """Field values as last read from or written to the database."""
+        if not hasattr(self, '_loaded_values'):
+            stored = None
+            if self.pk is not None:
+                stored = Registration.objects.filter(pk=self.pk).values('event_id', 'accepted', 'rejected').first()
+            self._loaded_values = stored or {}
+        return self._loaded_values
+
+    def save(self, *args, **kwargs):
+        if self.rejected:
+            self.accepted = False
+
+        stored = self.stored_values()
+        held_event_id = stored.get('event_id') if stored and not stored.get('rejected') else None
+        needed_event_id = self.event_id if self.holds_seat else None
+
+        with atomic_write():
+            if needed_event_id != held_event_id:
+                if needed_event_id is not None and not Event.objects.reserve_seats(needed_event_id):
+                    raise EventFull("Event is full.")
+                if held_event_id is not None:
+                    Event.objects.release_seats(held_event_id)
+            super().save(*args, **kwargs)
+            if held_event_id is not None and needed_event_id != held_event_id:
+                WaitlistEntry.objects.promote(held_event_id)
+
+        self._loaded_values = {'event_id': self.event_id, 'accepted': self.accepted, 'rejected': self.rejected}
+
     class Meta:
         unique_together = ('user', 'event')
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='registration_updated_idx'),
+            models.Index(fields=['user', 'accepted'], name='registration_user_acc_idx'),
+            models.Index(fields=['event', 'accepted'], name='registration_event_acc_idx'),
+        ]
+
+
+class WaitlistQuerySet(models.QuerySet):
+    def with_rank(self):
+        """
+        Annotate the 1-based place in the queue. Positions are handed out once
+        and never reused or moved, so the rank is the position less the entries
+        removed at or before it, a prefix sum over ``WaitlistDeparture`` that
+        reads at most one node per bit of the position.
+        """
+        removed = WaitlistDeparture.objects.removed_up_to(OuterRef('event'), OuterRef('position'))
+        return self.annotate(rank=F('position') - Coalesce(Subquery(removed), 0))
+
+    def join(self, user, event_id):
+        with atomic_write():
+            Event.objects.lock(event_id)
+            tail = self.filter(event=event_id).order_by('-position').values_list('position', flat=True).first() or 0
+            # Entries behind the current tail have all left, skip their positions too
+            departures = WaitlistDeparture.objects
+            behind = departures.removed_in_total(event_id) - departures.removed_up_to_value(event_id, tail)
+            entry = self.create(user=user, event_id=event_id, position=tail + behind + 1)
+            # A seat may have been freed after the caller saw the event as full
+            self.promote(event_id)
+        return entry
+
+    def delete(self):
+        with atomic_write():
+            removed = list(self.values_list('event_id', 'position'))
+            Event.objects.lock(*{event_id for event_id, _ in removed})
+            WaitlistDeparture.objects.record(removed)
+            return super().delete()
+
+    def promote(self, event_id):
+        """
+        Move users from the head of the waitlist into the free seats of an event,
+        as one batch inside the current transaction. Returns the promoted registrations.
+        """
+        promoted = []
+        with atomic_write():
+            Event.objects.lock(event_id)
+            while True:
+                seats = Event.objects.filter(pk=event_id).values_list('capacity', 'registered_count').first()
+                free = seats[0] - seats[1] if seats else 0
+                if free <= 0:
+                    break
+                already_registered = Registration.objects.filter(event=event_id, user=OuterRef('user'))
+                batch = list(
+                    self.filter(event=event_id).order_by('position')
+                    .annotate(registered=Exists(already_registered))
+                    .values_list('position', 'user_id', 'registered')[:free]
+                )
+                if not batch:
+                    break
+                user_ids = [user_id for _, user_id, registered in batch if not registered]
+                if not Event.objects.reserve_seats(event_id, len(user_ids)):
+                    break
+                promoted += Registration.objects.bulk_create(
+                    Registration(user_id=user_id, event_id=event_id) for user_id in user_ids
+                )
+                self.filter(event=event_id, position__lte=batch[-1][0]).delete()
+            if promoted:
+                ExportJob.objects.invalidate()
+                cache.bump('registration')
+        return promoted
+
+
+class WaitlistEntry(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    event = models.ForeignKey(Event, on_delete=models.CASCADE)
+    position = models.PositiveBigIntegerField(help_text="Order in the event queue, never reused; see WaitlistDeparture")
+    joined_at = models.DateTimeField(auto_now_add=True)
+
+    objects = WaitlistQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.user_id} - {self.event_id} (#{self.position})"
+
+    def delete(self, *args, **kwargs):
+        # Event first, the same lock order as joining and promotion
+        with atomic_write():
+            Event.objects.lock(self.event_id)
+            WaitlistDeparture.objects.record([(self.event_id, self.position)])
+            return super().delete(*args, **kwargs)
+
+    class Meta:
+        unique_together = ('user', 'event')
+        verbose_name_plural = 'waitlist entries'
+        indexes = [
+            models.Index(fields=['event', 'position'], name='waitlist_position_idx'),
+        ]
+
+
+class WaitlistDepartureQuerySet(models.QuerySet):
+    def record(self, removed):
+        """
+        Count ``(event_id, position)`` pairs as removed from their queues. Each
+        position adds to at most ``POSITION_BITS + 1`` nodes; callers hold the
+        event locks.
+        """
+        changes = Counter()
+        for event_id, position in removed:
+            while position <= WaitlistDeparture.SIZE:
+                changes[event_id, position] += 1
+                position += position & -position
+        by_event = {}
+        for (event_id, node), change in changes.items():
+            by_event.setdefault(event_id, {})[node] = change
+
+        for event_id, nodes in by_event.items():
+            counts = dict(self.filter(event=event_id, node__in=nodes).values_list('node', 'count'))
+            self.bulk_create(
+                [WaitlistDeparture(event_id=event_id, node=node, count=counts.get(node, 0) + change)
+                 for node, change in nodes.items()],
+                update_conflicts=True, unique_fields=['event', 'node'], update_fields=['count'],
+            )
+
+    @staticmethod
+    def prefix_nodes(position):
+        """The nodes that sum up to ``position``: clear its low bits one at a time."""
+        return {position & ~((1 << bit) - 1) for bit in range(WaitlistDeparture.POSITION_BITS + 1)} - {0}
+
+    def removed_up_to(self, event, position):
+        """``removed_up_to_value`` for expressions, as a one-value queryset to use in a ``Subquery``."""
+        nodes = [position] + [
+            position.bitand(~((1 << bit) - 1)) for bit in range(1, WaitlistDeparture.POSITION_BITS + 1)
+        ]
+        return (
+            self.filter(reduce(or_, (Q(node=node) for node in nodes)), event=event)
+            .order_by().values('event').annotate(total=Sum('count')).values('total')
+        )
+
+    def removed_up_to_value(self, event_id, position):
+        """How many positions of an event up to ``position`` were removed."""
+        nodes = self.filter(event=event_id, node__in=self.prefix_nodes(position))
+        return nodes.aggregate(total=Sum('count'))['total'] or 0
+
+    def removed_in_total(self, event_id):
+        return self.filter(event=event_id, node=WaitlistDeparture.SIZE).values_list('count', flat=True).first() or 0
+
+
+class WaitlistDeparture(models.Model):
+    """
+    A node of the per-event Fenwick tree counting positions removed from the
+    waitlist, whether the entry left or was promoted. Node ``i`` holds the
+    removals in ``(i - lowbit(i), i]``, so ranks and leaving both touch
+    ``O(log n)`` rows and no entry is ever renumbered.
+    """
+    POSITION_BITS = 40
+    SIZE = 1 << POSITION_BITS
+
+    event = models.ForeignKey(Event, on_delete=models.CASCADE)
+    node = models.PositiveBigIntegerField()
+    count = models.PositiveIntegerField(default=0)
+
+    objects = WaitlistDepartureQuerySet.as_manager()
+
+    class Meta:
+        unique_together = ('event', 'node')
+
+
+class CategoryAffinityQuerySet(models.QuerySet):
+    def adjust(self, user_id, category, delta):
+        """Add ``delta`` accepted registrations to a user's weight for a category."""
+        if not delta:
+            return
+        rows = self.filter(user_id=user_id, category=category)
+        if delta < 0:
+            rows.filter(weight__gte=-delta).update(weight=F('weight') + delta, updated_at=timezone.now())
+            rows.filter(weight=0).delete()
+            return
+
+        if rows.update(weight=F('weight') + delta, updated_at=timezone.now()):
+            return
+        try:
+            with atomic_write():
+                self.create(user_id=user_id, category=category, weight=delta)
+        except IntegrityError:
+            # Another request created the row first
+            rows.update(weight=F('weight') + delta, updated_at=timezone.now())
+
+    def bulk_adjust(self, user_ids, category, delta):
+        """
+        ``adjust`` for many users of one category with a few queries per distinct
+        weight change. A user listed ``n`` times is adjusted by ``n * delta``.
+        """
+        by_delta = {}
+        for user_id, times in Counter(user_ids).items():
+            by_delta.setdefault(times * delta, []).append(user_id)
+
+        for change, changed_user_ids in by_delta.items():
+            rows = self.filter(user_id__in=changed_user_ids, category=category)
+            if change < 0:
+                rows.filter(weight__gte=-change).update(weight=F('weight') + change, updated_at=timezone.now())
+                rows.filter(weight=0).delete()
+                continue
+
+            existing = set(rows.values_list('user_id', flat=True))
+            rows.update(weight=F('weight') + change, updated_at=timezone.now())
+            self.bulk_create(
+                [self.model(user_id=user_id, category=category, weight=change)
+                 for user_id in changed_user_ids if user_id not in existing],
+                ignore_conflicts=True,
+            )
+
+    def rebuild(self, user_ids=None, batch_size=1000):
+        """Recompute affinities from accepted registrations, for all users or ``user_ids``."""
+        registrations = Registration.objects.filter(accepted=True)
+        stale = self.all()
+        if user_ids is not None:
+            registrations = registrations.filter(user_id__in=user_ids)
+            stale = stale.filter(user_id__in=user_ids)
+
+        weights = (
+            registrations.order_by()
+            .values_list('user_id', 'event__category')
+            .annotate(weight=Count('pk'))
+        )
+        created = 0
+        with atomic_write():
+            stale.delete()
+            batch = []
+            for user_id, category, weight in weights.iterator():
+                batch.append(self.model(user_id=user_id, category=category, weight=weight))
+                if len(batch) >= batch_size:
+                    created += len(self.bulk_create(batch))
+                    batch = []
+            created += len(self.bulk_create(batch))
+        return created
+
+
+class CategoryAffinity(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    category = models.CharField(max_length=255, choices=utils.CATEGORY_CHOICES)
+    weight = models.PositiveIntegerField(default=0, help_text="Accepted registrations in this category")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = CategoryAffinityQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.user_id} - {self.category} ({self.weight})"
+
+    class Meta:
+        unique_together = ('user', 'category')
+        verbose_name_plural = 'category affinities'
+
+
+class ExportJobQuerySet(models.QuerySet):
+    def reusable(self, fingerprint):
+        return self.filter(fingerprint=fingerprint, stale=False).exclude(status=ExportJob.FAILED)
+
+    def abandoned(self):
+        """Queued or running jobs whose worker has not reported for ``EXPORT_JOB_TIMEOUT`` seconds."""
+        cutoff = timezone.now() - timezone.timedelta(seconds=settings.EXPORT_JOB_TIMEOUT)
+        return self.filter(status__in=(ExportJob.PENDING, ExportJob.RUNNING), heartbeat_at__lt=cutoff)
+
+    def expire(self):
+        """Fail abandoned jobs so the same filters can be queued again."""
+        return self.abandoned().update(
+            status=ExportJob.FAILED, error="The export stopped reporting progress.", finished_at=timezone.now()
+        )
+
+    def invalidate(self):
+        """Mark every artifact as outdated after the exported data changed."""
+        return self.filter(stale=False).update(stale=True)
+
+
+class ExportJob(models.Model):
+    PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+    STATUS_CHOICES = (
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    created_by = models.ForeignKey(User, null=True, on_delete=models.SET_NULL)
+    params = models.JSONField(default=dict, help_text="Normalized export filters")
+    fingerprint = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=PENDING)
+    rows_total = models.PositiveIntegerField(default=0)
+    rows_written = models.PositiveIntegerField(default=0)
+    file_name = models.CharField(max_length=255, blank=True)
+    error = models.TextField(blank=True)
+    stale = models.BooleanField(default=False, help_text="Registrations changed after this job started")
+    created_at = models.DateTimeField(auto_now_add=True)
+    heartbeat_at = models.DateTimeField(default=timezone.now, help_text="Last progress report of the worker")
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    objects = ExportJobQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            # One live job per filter set, so concurrent requests cannot queue the same export twice
+            models.UniqueConstraint(
+                fields=['fingerprint'],
+                condition=Q(stale=False, status__in=('pending', 'running', 'done')),
+                name='exportjob_live_fingerprint_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.id} ({self.status})"
+
+    @property
+    def export_format(self):
+        return self.params.get("format", "xlsx")
+
+    @property
+    def progress(self):
+        if self.status == self.DONE:
+            return 1.0
+        return round(self.rows_written / self.rows_total, 4) if self.rows_total else 0.0
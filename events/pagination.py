@@ -0,0 +1,278 @@
+import base64
+import binascii
+import datetime
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+PAGE_SIZE = getattr(settings, "API_PAGE_SIZE", 10)
+MAX_PAGE_SIZE = getattr(settings, "API_MAX_PAGE_SIZE", 100)
+
+
+class BoundedPageNumberPagination(PageNumberPagination):
+    """
+    Page numbers sized per request with ``?page_size=``, capped at ``max_page_size``.
+    ``?count=false`` (or ``include_count = False`` on a subclass) skips the
+    ``COUNT(*)`` and reads one extra row to know whether a next page exists.
+    """
+    page_size = PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = MAX_PAGE_SIZE
+    count_query_param = "count"
+    include_count = True
+
+    def counts(self, request):
+        value = request.query_params.get(self.count_query_param)
+        if value is None:
+            return self.include_count
+        return value.lower() not in ("0", "false", "no")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.count_free = not self.counts(request)
+        if not self.count_free:
+            return super().paginate_queryset(queryset, request, view)
+        return self._count_free_page(list(self._count_free_window(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` for async views, reading the page with the async ORM."""
+        self.request = request
+        self.count_free = not self.counts(request)
+        if self.count_free:
+            return self._count_free_page([obj async for obj in self._count_free_window(queryset, request)])
+
+        paginator = self.django_paginator_class(queryset, self.get_page_size(request))
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        self.page.object_list = [obj async for obj in self.page.object_list]
+        return list(self.page)
+
+    def _count_free_window(self, queryset, request):
+        self.page_size = self.get_page_size(request)
+        try:
+            self.page_number = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            self.page_number = 0
+        if self.page_number < 1:
+            raise NotFound(self.invalid_page_message)
+
+        offset = (self.page_number - 1) * self.page_size
+        return queryset[offset:offset + self.page_size + 1]
+
+    def _count_free_page(self, results):
+        if not results and self.page_number > 1:
+            raise NotFound(self.invalid_page_message)
+        self.has_next = len(results) > self.page_size
+        return results[:self.page_size]
+
+    def get_paginated_response(self, data):
+        if not self.count_free:
+            return super().get_paginated_response(data)
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_next_link(self):
+        if not self.count_free:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.page_query_param, self.page_number + 1)
+
+    def get_previous_link(self):
+        if not self.count_free:
+            return super().get_previous_link()
+        if self.page_number <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page_number - 1)
+
+
+class VenueSearchPagination(CursorPagination):
+    ordering = "pk"
+    page_size = PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = MAX_PAGE_SIZE
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    # DjangoJSONEncoder drops microseconds past the millisecond, which would
+    # make a cursor sort before the row it was taken from
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination that seeks on the full ``ordering`` tuple, which must end
+    with a unique field. Unlike ``CursorPagination``, whose cursor holds only the
+    first ordering field plus an offset, every page is a range read on an index
+    over ``ordering``, however deep it is and however many rows share a date.
+    """
+    ordering = ("pk",)
+    page_size = PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = MAX_PAGE_SIZE
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(page_size, self.max_page_size) if page_size > 0 else self.page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self._set_page(list(self._page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        return self._set_page([obj async for obj in self._page_queryset(queryset, request)])
+
+    def _page_queryset(self, queryset, request):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.position, self.reverse = self.decode_cursor(request, queryset.model)
+
+        ordering = [self._flip(field) for field in self.ordering] if self.reverse else list(self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if self.position is not None:
+            queryset = queryset.filter(self._after(ordering, self.position))
+        return queryset[:self.page_size + 1]
+
+    def _set_page(self, results):
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if self.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = self.position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.position is not None
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        position = self._position(self.page[-1]) if self.page else self.position
+        return self.encode_cursor(position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = self._position(self.page[0]) if self.page else self.position
+        return self.encode_cursor(position, reverse=True)
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps({"p": position, "r": int(reverse)}, cls=CursorEncoder)
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request, model):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+            fields = [self._field(model, name) for name in self.ordering]
+            if len(payload["p"]) != len(fields):
+                raise ValueError
+            position = [field.to_python(value) for field, value in zip(fields, payload["p"])]
+            return position, bool(payload.get("r"))
+        except (TypeError, KeyError, ValueError, UnicodeDecodeError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _position(self, obj):
+        return [getattr(obj, field.lstrip("-")) for field in self.ordering]
+
+    @staticmethod
+    def _field(model, name):
+        name = name.lstrip("-")
+        return model._meta.pk if name == "pk" else model._meta.get_field(name)
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    @staticmethod
+    def _after(ordering, position):
+        # (a, b, c) > (x, y, z) spelled out, with a bound on the leading column so
+        # the database can turn it into an index range scan
+        names = [field.lstrip("-") for field in ordering]
+        lookups = ["lt" if field.startswith("-") else "gt" for field in ordering]
+        condition = Q()
+        for i, (name, lookup, value) in enumerate(zip(names, lookups, position)):
+            condition |= Q(**dict(zip(names[:i], position[:i])), **{f"{name}__{lookup}": value})
+        return Q(**{f"{names[0]}__{lookups[0]}e": position[0]}) & condition
+
+
+class SelectablePagination(BasePagination):
+    """
+    Page numbers by default; keyset pagination over ``ordering`` when the client
+    asks for ``?pagination=cursor`` or follows a cursor link.
+    """
+    ordering = ("pk",)
+    mode_query_param = "pagination"
+
+    def uses_cursor(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == "cursor"
+            or KeysetPagination.cursor_query_param in request.query_params
+        )
+
+    def select(self, request):
+        if self.uses_cursor(request):
+            self.paginator = KeysetPagination()
+            self.paginator.ordering = self.ordering
+        else:
+            self.paginator = BoundedPageNumberPagination()
+        return self.paginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.select(request).paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        return await self.select(request).apaginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+
+class EventPagination(SelectablePagination):
+    ordering = ("date", "time", "pk")
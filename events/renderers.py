@@ -0,0 +1,57 @@
+from rest_framework.exceptions import NotAcceptable
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from .exports import EXPORT_FORMATS
+
+
+class ExportRenderer(BaseRenderer):
+    """
+    Lets DRF content negotiation (``?format=`` or ``Accept``) pick an export
+    format. Export bodies are streamed by the view itself, so only error
+    payloads are ever rendered here and they are sent as JSON.
+    """
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get("response")
+        if response is not None:
+            response["Content-Type"] = "application/json"
+        return JSONRenderer().render(data)
+
+
+class XLSXRenderer(ExportRenderer):
+    media_type = EXPORT_FORMATS["xlsx"][0]
+    format = "xlsx"
+
+
+class CSVRenderer(ExportRenderer):
+    media_type = EXPORT_FORMATS["csv"][0]
+    format = "csv"
+
+
+class JSONLinesRenderer(ExportRenderer):
+    media_type = EXPORT_FORMATS["jsonl"][0]
+    format = "jsonl"
+
+
+class ParquetRenderer(ExportRenderer):
+    media_type = EXPORT_FORMATS["parquet"][0]
+    format = "parquet"
+
+
+class ArrowRenderer(ExportRenderer):
+    media_type = EXPORT_FORMATS["arrow"][0]
+    format = "arrow"
+
+
+class ExportContentNegotiation(DefaultContentNegotiation):
+    """Fall back to the default export format when only the Accept header is unsatisfiable."""
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        try:
+            return super().select_renderer(request, renderers, format_suffix)
+        except NotAcceptable:
+            if format_suffix or self.settings.URL_FORMAT_OVERRIDE in request.query_params:
+                raise
+            return renderers[0], renderers[0].media_type
@@ -1,8 +1,21 @@
 from rest_framework.exceptions import PermissionDenied
 from rest_framework import serializers
+from rest_framework_simplejwt import serializers as jwt_serializers
+from django.db import IntegrityError
 from django.utils import timezone
 
-from .models import Venue, Event, Registration, User
+from django.urls import reverse
+
+from .models import Venue, Event, Registration, User, ExportJob, EventFull, WaitlistEntry
+
+
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token["is_staff"] = user.is_staff
+        token["is_superuser"] = user.is_superuser
+        return token
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -16,7 +29,7 @@ class EventSerializer(serializers.ModelSerializer):
     class Meta:
         model = Event
         fields = '__all__'
-        read_only_fields = ("created_by",)
+        read_only_fields = ("created_by", "registered_count")
 
     def create(self, validated_data):
         user = self.context['request'].user
@@ -36,10 +49,10 @@ class VenueSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Venue
-        fields = '__all__'
+        exclude = ('booked_ranges',)
 
     def get_booked_dates(self, obj):
-        return obj.get_booked_dates()
+        return list(obj.get_booked_dates())
 
     def get_available_dates(self, obj):
         return obj.get_available_dates()
@@ -48,6 +61,40 @@ class VenueSerializer(serializers.ModelSerializer):
         return obj.get_all_events()
 
 
+class VenueAvailabilityQuerySerializer(serializers.Serializer):
+    date = serializers.DateField(required=False)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # "from" is a Python keyword so the range fields are declared here
+        self.fields['from'] = serializers.DateField(required=False)
+        self.fields['to'] = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        if attrs.get('from') and attrs.get('to') and attrs['from'] > attrs['to']:
+            raise serializers.ValidationError("'from' must not be after 'to'.")
+        return attrs
+
+
+class VenueSearchQuerySerializer(VenueAvailabilityQuerySerializer):
+    capacity = serializers.IntegerField(min_value=0, default=0)
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        start = attrs.get('date') or attrs.get('from')
+        if start is None:
+            raise serializers.ValidationError("Provide either 'date' or a 'from'/'to' range.")
+        attrs['from'] = start
+        attrs['to'] = attrs.get('date') or attrs.get('to') or start
+        return attrs
+
+
+class VenueSearchSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Venue
+        fields = ('id', 'name', 'capacity', 'amenities')
+
+
 class RegistrationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Registration
@@ -58,7 +105,103 @@ class RegistrationSerializer(serializers.ModelSerializer):
         user = self.context['request'].user
         validated_data['user'] = user
         validated_data["accepted"] = False
-        return super().create(validated_data)
+        validated_data["rejected"] = False
+        try:
+            return super().create(validated_data)
+        except EventFull as exc:
+            raise serializers.ValidationError({"event": exc.messages})
+        except IntegrityError:
+            raise serializers.ValidationError({"event": ["You are already registered for this event."]})
+
+    def update(self, instance, validated_data):
+        # Accepting a registration overrides an earlier rejection
+        if validated_data.get("accepted"):
+            validated_data["rejected"] = False
+        try:
+            return super().update(instance, validated_data)
+        except EventFull as exc:
+            raise serializers.ValidationError({"event": exc.messages})
+
+
+class BulkRegistrationSerializer(serializers.Serializer):
+    """
+    Only the payload shape is validated field by field; users, events and
+    existing registrations are checked in bulk by ``Registration.objects.bulk_register``
+    and reported per item instead of failing the whole request.
+    """
+    max_items = 10000
+
+    registrations = serializers.ListField(child=serializers.DictField(), allow_empty=False, max_length=max_items)
+
+    def create(self, validated_data):
+        user = self.context['request'].user
+        pk_field = serializers.IntegerField(min_value=1)
+
+        results, pairs, positions = [], [], []
+        for item in validated_data['registrations']:
+            errors, pair = {}, []
+            for name, default in (('user', user.pk), ('event', None)):
+                value = item.get(name, default)
+                # Plain JSON integers skip the field machinery, which adds up over 10k items
+                if type(value) is int and value >= 1:
+                    pair.append(value)
+                    continue
+                try:
+                    pair.append(pk_field.run_validation(value))
+                except serializers.ValidationError as exc:
+                    errors[name] = exc.detail
+            if not errors and pair[0] != user.pk and not user.is_staff:
+                errors['user'] = ["You can only register yourself."]
+            results.append({"status": "error", "errors": errors})
+            if not errors:
+                positions.append(len(results) - 1)
+                pairs.append(tuple(pair))
+
+        for position, (user_id, event_id), result in zip(positions, pairs, Registration.objects.bulk_register(pairs)):
+            if isinstance(result, int):
+                results[position] = {"status": "created", "id": result, "user": user_id, "event": event_id}
+            else:
+                results[position]["errors"] = result
+        return results
+
+
+class EventImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    format = serializers.ChoiceField(choices=("csv", "xlsx"), required=False)
+
+
+class RegistrationModerationSerializer(serializers.Serializer):
+    event = serializers.PrimaryKeyRelatedField(queryset=Event.objects.all())
+    action = serializers.ChoiceField(choices=("accept", "reject"))
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+
+
+class WaitlistEntrySerializer(serializers.ModelSerializer):
+    rank = serializers.SerializerMethodField()
+
+    class Meta:
+        model = WaitlistEntry
+        fields = ('id', 'user', 'event', 'rank', 'joined_at')
+        read_only_fields = ("user",)
+
+    def get_rank(self, obj):
+        if hasattr(obj, 'rank'):
+            return obj.rank
+        # None once the entry has been promoted to a registration
+        return WaitlistEntry.objects.with_rank().filter(pk=obj.pk).values_list('rank', flat=True).first()
+
+    def validate_event(self, value):
+        if value.registered_count < value.capacity:
+            raise serializers.ValidationError("Event has free seats, register instead.")
+        if Registration.objects.filter(user=self.context['request'].user, event=value).exists():
+            raise serializers.ValidationError("You are already registered for this event.")
+        return value
+
+    def create(self, validated_data):
+        try:
+            return WaitlistEntry.objects.join(self.context['request'].user, validated_data['event'].pk)
+        except IntegrityError:
+            raise serializers.ValidationError({"event": ["You are already on the waitlist for this event."]})
 
 
 class RegistrationExportSerializer(serializers.ModelSerializer):
@@ -68,3 +211,22 @@ class RegistrationExportSerializer(serializers.ModelSerializer):
     class Meta:
         model = Registration
         fields = ['user_username', 'event_title', 'registration_date', 'accepted']
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    progress = serializers.ReadOnlyField()
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = [
+            'id', 'status', 'params', 'progress', 'rows_written', 'rows_total',
+            'stale', 'error', 'created_at', 'finished_at', 'download_url',
+        ]
+
+    def get_download_url(self, obj):
+        if obj.status != ExportJob.DONE:
+            return None
+        url = reverse('registration_export_jobs-download', kwargs={'pk': obj.pk})
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
@@ -0,0 +1,122 @@
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from .models import User, Venue, Event, Registration, CategoryAffinity, ExportJob, WaitlistEntry, WaitlistDeparture
+from . import cache
+from .authentication import user_cache
+
+
+def _event_category(event_id):
+    return Event.objects.filter(pk=event_id).values_list('category', flat=True).first()
+
+
+@receiver(post_save, sender=Registration)
+def update_affinity_on_save(sender, instance, created, **kwargs):
+    # Registration.save refreshes the stored values only after signals ran
+    stored = {} if created else instance.stored_values()
+    was_accepted = bool(stored.get('accepted', False))
+    old_event_id = stored.get('event_id', instance.event_id)
+
+    if old_event_id != instance.event_id:
+        # Moving to another event moves the acceptance to that event's category
+        if was_accepted:
+            CategoryAffinity.objects.adjust(instance.user_id, _event_category(old_event_id), -1)
+        if instance.accepted:
+            CategoryAffinity.objects.adjust(instance.user_id, _event_category(instance.event_id), 1)
+    elif instance.accepted != was_accepted:
+        delta = 1 if instance.accepted else -1
+        CategoryAffinity.objects.adjust(instance.user_id, _event_category(instance.event_id), delta)
+
+
+@receiver(post_delete, sender=Registration)
+def update_affinity_on_delete(sender, instance, **kwargs):
+    was_accepted = getattr(instance, '_loaded_values', {}).get('accepted', instance.accepted)
+    if was_accepted:
+        CategoryAffinity.objects.adjust(instance.user_id, _event_category(instance.event_id), -1)
+
+
+@receiver(post_delete, sender=Registration)
+def release_seat_on_delete(sender, instance, origin=None, **kwargs):
+    was_rejected = getattr(instance, '_loaded_values', {}).get('rejected', instance.rejected)
+    if not was_rejected:
+        Event.objects.release_seats(instance.event_id)
+        # Nothing to promote into when the event itself is being deleted
+        if getattr(origin, 'model', type(origin)) not in (Event, Venue):
+            WaitlistEntry.objects.promote(instance.event_id)
+
+
+@receiver(pre_delete, sender=WaitlistEntry)
+def record_waitlist_departure_on_cascade(sender, instance, origin=None, **kwargs):
+    # Entry and queryset deletes record their own departures; a deleted event takes its queue along
+    if getattr(origin, 'model', type(origin)) in (WaitlistEntry, Event, Venue):
+        return
+    Event.objects.lock(instance.event_id)
+    WaitlistDeparture.objects.record([(instance.event_id, instance.position)])
+
+
+@receiver(pre_save, sender=Event)
+def remember_event_state(sender, instance, **kwargs):
+    instance._previous_state = (
+        Event.objects.filter(pk=instance.pk).values('category', 'location_id', 'date', 'capacity').first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Event)
+def update_affinity_on_category_change(sender, instance, created, **kwargs):
+    previous_state = getattr(instance, '_previous_state', None)
+    if created or not previous_state or previous_state['category'] == instance.category:
+        return
+    user_ids = Registration.objects.filter(event=instance, accepted=True).values_list('user_id', flat=True)
+    CategoryAffinity.objects.rebuild(user_ids=list(user_ids))
+
+
+@receiver(post_save, sender=Event)
+def update_venue_calendar_on_save(sender, instance, created, **kwargs):
+    previous_state = getattr(instance, '_previous_state', None)
+    if not previous_state:
+        Venue.refresh_calendars([instance.location_id])
+    elif (previous_state['location_id'], previous_state['date']) != (instance.location_id, instance.date):
+        Venue.refresh_calendars([previous_state['location_id'], instance.location_id])
+
+
+@receiver(post_save, sender=Event)
+def promote_waitlist_on_capacity_increase(sender, instance, created, **kwargs):
+    previous_state = getattr(instance, '_previous_state', None)
+    if previous_state and instance.capacity > previous_state['capacity']:
+        WaitlistEntry.objects.promote(instance.pk)
+
+
+@receiver(post_delete, sender=Event)
+def update_venue_calendar_on_delete(sender, instance, **kwargs):
+    Venue.refresh_calendars([instance.location_id])
+
+
+@receiver(post_save, sender=Registration)
+@receiver(post_delete, sender=Registration)
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_export_artifacts(sender, update_fields=None, **kwargs):
+    # Logins only touch last_login, which is not part of the export
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    ExportJob.objects.invalidate()
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+@receiver(post_save, sender=Venue)
+@receiver(post_delete, sender=Venue)
+@receiver(post_save, sender=Registration)
+@receiver(post_delete, sender=Registration)
+def bump_response_cache_version(sender, **kwargs):
+    cache.bump(sender._meta.model_name)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def evict_cached_user(sender, instance, **kwargs):
+    # Covers deactivation, staff changes and password changes alike
+    user_cache.evict(instance.pk)
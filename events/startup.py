@@ -0,0 +1,50 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+
+
+# Libraries only some requests need; none of them may load with the app
+HEAVY_MODULES = ("pandas", "numpy", "pyarrow", "openpyxl")
+
+# Generous enough for a loaded CI box; importing pandas at boot costs ~0.6 s and ~75 MB
+STARTUP_BUDGET_SECONDS = 2.0
+STARTUP_BUDGET_RSS_MB = 100
+
+PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+seconds = time.perf_counter() - started
+try:
+    # ru_maxrss survives exec on Linux, so it would report the parent's peak
+    with open("/proc/self/status") as status:
+        peak_kb = next(int(line.split()[1]) for line in status if line.startswith("VmHWM:"))
+except OSError:
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak_kb /= 1024
+print(json.dumps({
+    "seconds": seconds,
+    "peak_rss_mb": peak_kb / 1024,
+    "heavy_modules": [name for name in json.loads(sys.argv[1]) if name in sys.modules],
+}))
+"""
+
+
+def measure_startup():
+    """
+    Time ``django.setup()`` plus the URLConf import in a fresh interpreter and
+    report its peak RSS and which of ``HEAVY_MODULES`` got imported.
+    """
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE}
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE, json.dumps(HEAVY_MODULES)],
+        env=env, cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output)
@@ -0,0 +1,35 @@
+import re
+
+from django.db import connections
+
+
+FULL_SCAN = re.compile(r"^SCAN (?!CONSTANT ROW)(\w+)")
+
+
+class QueryPlanMixin:
+    """
+    Assertions on SQLite's ``EXPLAIN QUERY PLAN``. A ``SCAN <table>`` step, with
+    or without an index, reads the whole table; ``SEARCH`` steps seek an index.
+    Other backends skip these checks.
+    """
+
+    def query_plan(self, queryset):
+        connection = connections[queryset.db]
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assertNoFullScan(self, queryset, allow=(), msg=None):
+        """
+        Fail on any full scan except of the tables in ``allow``. An allowed scan
+        must still be in the plan, so the allowance goes once it is fixed.
+        """
+        if connections[queryset.db].vendor != "sqlite":
+            self.skipTest("EXPLAIN QUERY PLAN checks need SQLite")
+        plan = self.query_plan(queryset)
+        scanned = {FULL_SCAN.match(step).group(1) for step in plan if FULL_SCAN.match(step)}
+        if scanned - set(allow):
+            self.fail(self._formatMessage(msg, "Full table scan in query plan:\n  " + "\n  ".join(plan)))
+        if set(allow) - scanned:
+            self.fail(self._formatMessage(msg, "Allowed scan no longer in query plan:\n  " + "\n  ".join(plan)))
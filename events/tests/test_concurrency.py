@@ -0,0 +1,111 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, transaction, OperationalError
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from events.models import User, Venue, Event, Registration
+from events.transactions import atomic_write
+from events.utils import CATEGORY_CHOICES
+
+
+class RegistrationRushTestCase(TransactionTestCase):
+    """
+    Many clients race for the last seats of an event. Runs against whatever
+    database is configured; PostgreSQL exercises real row-level contention,
+    while SQLite's shared in-memory test database reports lock conflicts
+    instead of waiting, so clients retry those and only the end state is
+    checked there.
+    """
+    users_count = 48
+    capacity = 10
+
+    def setUp(self):
+        User.objects.bulk_create([
+            User(username=f'rushuser{i}', email=f'rush{i}@example.com')
+            for i in range(self.users_count)
+        ])
+        self.users = list(User.objects.order_by('pk'))
+        venue = Venue.objects.create(name='Rush Venue', capacity=500, amenities='All')
+        self.event = Event.objects.create(
+            title='Rush Event',
+            description='Test Description',
+            date=timezone.now().date() + timezone.timedelta(days=2),
+            time=timezone.now().time(),
+            location=venue,
+            capacity=self.capacity,
+            category=CATEGORY_CHOICES[0][0],
+            created_by=self.users[0]
+        )
+
+    def register(self, user, barrier):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        barrier.wait()
+        try:
+            for _ in range(50):
+                try:
+                    return client.post(reverse("registrations-list"), {"event": self.event.id}).status_code
+                except OperationalError:
+                    continue
+        finally:
+            connection.close()
+
+    def test_registration_rush_never_oversells(self):
+        barrier = Barrier(self.users_count)
+        with ThreadPoolExecutor(max_workers=self.users_count) as pool:
+            results = list(pool.map(lambda user: self.register(user, barrier), self.users))
+
+        self.event.refresh_from_db()
+        self.assertEqual(Registration.objects.filter(event=self.event).count(), self.capacity)
+        self.assertEqual(self.event.registered_count, self.capacity)
+
+        if connection.vendor != 'sqlite':
+            self.assertEqual(results.count(status.HTTP_201_CREATED), self.capacity)
+            self.assertEqual(results.count(status.HTTP_400_BAD_REQUEST), self.users_count - self.capacity)
+
+
+class SQLiteConnectionSettingsTestCase(TransactionTestCase):
+
+    def setUp(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite connection settings')
+
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_init_command_runs_on_connect(self):
+        connection.ensure_connection()
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('cache_size'), -20000)
+
+    def test_write_transactions_take_write_lock_up_front(self):
+        with CaptureQueriesContext(connection) as queries:
+            with atomic_write():
+                User.objects.count()
+        self.assertEqual(queries[0]['sql'], 'BEGIN IMMEDIATE')
+
+        # Read-only blocks do not queue behind writers
+        with CaptureQueriesContext(connection) as queries:
+            with transaction.atomic():
+                User.objects.count()
+        self.assertEqual(queries[0]['sql'], 'BEGIN')
+
+    def test_unknown_transaction_mode(self):
+        options = connection.settings_dict['OPTIONS']
+        previous = options.get('transaction_mode')
+        options['transaction_mode'] = 'LAZY'
+        try:
+            with self.assertRaises(ImproperlyConfigured):
+                connection.transaction_mode
+        finally:
+            options['transaction_mode'] = previous
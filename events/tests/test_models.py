@@ -2,10 +2,15 @@ from django.test import TestCase
 from django.utils import timezone
 from datetime import timedelta
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+from django.core.management import call_command
+from io import StringIO
+from tempfile import TemporaryDirectory
 
-from events.models import User, Venue, Registration, Event
+from events.models import User, Venue, Registration, Event, CategoryAffinity, EventFull, WaitlistEntry, WaitlistDeparture
 from events import utils
+from events.availability import VenueCalendar
 
 class UserModelTest(TestCase):
     def setUp(self):
@@ -85,6 +90,80 @@ class VenueModelTest(TestCase):
         available_dates = self.venue.get_available_dates()
         self.assertNotIn(event.date, available_dates)
 
+    def test_calendar_follows_event_changes(self):
+        today = timezone.now().date()
+        event = Event.objects.create(
+            title='Test Event',
+            description='Test Description',
+            date=today + timedelta(days=3),
+            time=timezone.now().time(),
+            location=self.venue,
+            capacity=50,
+            category=utils.CATEGORY_CHOICES[0][0],
+            created_by=self.user
+        )
+        self.venue.refresh_from_db()
+        self.assertFalse(self.venue.calendar.is_free(event.date))
+        self.assertEqual(
+            self.venue.get_available_dates(),
+            [today, today + timedelta(days=1), today + timedelta(days=2)]
+        )
+
+        event.date = today + timedelta(days=1)
+        event.save()
+        self.venue.refresh_from_db()
+        self.assertTrue(self.venue.calendar.is_free(today + timedelta(days=3)))
+        self.assertFalse(self.venue.calendar.is_free(today + timedelta(days=1)))
+
+        event.delete()
+        self.venue.refresh_from_db()
+        self.assertEqual(self.venue.get_available_dates(), ["No bookings"])
+
+    def test_save_keeps_booked_ranges(self):
+        stale = Venue.objects.get(pk=self.venue.pk)
+        event = Event.objects.create(
+            title='Test Event',
+            description='Test Description',
+            date=timezone.now().date() + timedelta(days=3),
+            time=timezone.now().time(),
+            location=self.venue,
+            capacity=50,
+            category=utils.CATEGORY_CHOICES[0][0],
+            created_by=self.user
+        )
+
+        stale.capacity = 200
+        stale.save()
+        self.venue.refresh_from_db()
+        self.assertEqual(self.venue.capacity, 200)
+        self.assertFalse(self.venue.calendar.is_free(event.date))
+
+
+class VenueCalendarTest(TestCase):
+    def setUp(self):
+        self.start = timezone.now().date()
+        booked = [self.start + timedelta(days=offset) for offset in (2, 3, 4, 8)]
+        self.calendar = VenueCalendar.from_dates(booked)
+
+    def test_runs_are_merged(self):
+        self.assertEqual(len(self.calendar.ranges), 2)
+        self.assertEqual(self.calendar.last_booked, self.start + timedelta(days=8))
+
+    def test_is_free(self):
+        self.assertTrue(self.calendar.is_free(self.start))
+        self.assertFalse(self.calendar.is_free(self.start + timedelta(days=3)))
+        self.assertTrue(self.calendar.is_free(self.start + timedelta(days=5)))
+        self.assertTrue(self.calendar.is_free(self.start + timedelta(days=30)))
+
+    def test_free_ranges(self):
+        day = lambda offset: self.start + timedelta(days=offset)
+        self.assertEqual(
+            self.calendar.free_ranges(day(0), day(10)),
+            [(day(0), day(1)), (day(5), day(7)), (day(9), day(10))]
+        )
+        self.assertEqual(self.calendar.free_ranges(day(3), day(4)), [])
+        self.assertEqual(self.calendar.booked_ranges(day(3), day(9)), [(day(3), day(4)), (day(8), day(8))])
+
 
 class EventModelTest(TestCase):
     def setUp(self):
@@ -164,3 +243,361 @@ class RegistrationModelTest(TestCase):
                 accepted=False
             )
 
+
+
+class CategoryAffinityTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpassword'
+        )
+        self.venue = Venue.objects.create(
+            name='Test Venue',
+            capacity=100,
+            amenities='Amenity 1, Amenity 2'
+        )
+        self.events = [
+            Event.objects.create(
+                title=f'Test Event {i}',
+                description='Test Description',
+                date=timezone.now().date() + timedelta(days=1),
+                time=timezone.now().time(),
+                location=self.venue,
+                capacity=50,
+                category=utils.CATEGORY_CHOICES[0][0],
+                created_by=self.user
+            )
+            for i in range(2)
+        ]
+
+    def get_weight(self, category=utils.CATEGORY_CHOICES[0][0]):
+        affinity = CategoryAffinity.objects.filter(user=self.user, category=category).first()
+        return affinity.weight if affinity else 0
+
+    def test_affinity_follows_accepted_registrations(self):
+        first = Registration.objects.create(user=self.user, event=self.events[0])
+        self.assertEqual(self.get_weight(), 0)
+
+        first.accepted = True
+        first.save()
+        Registration.objects.create(user=self.user, event=self.events[1], accepted=True)
+        self.assertEqual(self.get_weight(), 2)
+
+        first = Registration.objects.get(pk=first.pk)
+        first.accepted = False
+        first.save()
+        self.assertEqual(self.get_weight(), 1)
+
+        Registration.objects.filter(event=self.events[1]).delete()
+        self.assertFalse(CategoryAffinity.objects.filter(user=self.user).exists())
+
+    def test_affinity_follows_event_category(self):
+        Registration.objects.create(user=self.user, event=self.events[0], accepted=True)
+        self.events[0].category = utils.CATEGORY_CHOICES[1][0]
+        self.events[0].save()
+
+        self.assertEqual(self.get_weight(), 0)
+        self.assertEqual(self.get_weight(utils.CATEGORY_CHOICES[1][0]), 1)
+
+    def test_affinity_follows_event_change(self):
+        other = utils.CATEGORY_CHOICES[1][0]
+        self.events[1].category = other
+        self.events[1].save()
+        registration = Registration.objects.create(user=self.user, event=self.events[0], accepted=True)
+
+        registration.event = self.events[1]
+        registration.save()
+        self.assertEqual(self.get_weight(), 0)
+        self.assertEqual(self.get_weight(other), 1)
+
+        registration.event = self.events[0]
+        registration.accepted = False
+        registration.save()
+        self.assertEqual(self.get_weight(), 0)
+        self.assertEqual(self.get_weight(other), 0)
+
+    def test_rebuild_category_affinity_command(self):
+        Registration.objects.create(user=self.user, event=self.events[0], accepted=True)
+        Registration.objects.create(user=self.user, event=self.events[1], accepted=True)
+        CategoryAffinity.objects.all().delete()
+
+        call_command('rebuild_category_affinity', stdout=StringIO())
+        self.assertEqual(self.get_weight(), 2)
+
+
+class EventSeatTest(TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(username=f'testuser{i}', password='testpassword')
+            for i in range(3)
+        ]
+        self.venue = Venue.objects.create(
+            name='Test Venue',
+            capacity=100,
+            amenities='Amenity 1, Amenity 2'
+        )
+        self.event = Event.objects.create(
+            title='Test Event',
+            description='Test Description',
+            date=timezone.now().date() + timedelta(days=1),
+            time=timezone.now().time(),
+            location=self.venue,
+            capacity=2,
+            category=utils.CATEGORY_CHOICES[0][0],
+            created_by=self.users[0]
+        )
+
+    def registered_count(self):
+        self.event.refresh_from_db()
+        return self.event.registered_count
+
+    def test_registrations_reserve_seats_up_to_capacity(self):
+        Registration.objects.create(user=self.users[0], event=self.event)
+        Registration.objects.create(user=self.users[1], event=self.event)
+        self.assertEqual(self.registered_count(), 2)
+
+        with self.assertRaises(EventFull):
+            Registration.objects.create(user=self.users[2], event=self.event)
+        self.assertEqual(Registration.objects.count(), 2)
+        self.assertEqual(self.registered_count(), 2)
+
+    def test_duplicate_registration_does_not_leak_seat(self):
+        Registration.objects.create(user=self.users[0], event=self.event)
+        with self.assertRaises(IntegrityError):
+            Registration.objects.create(user=self.users[0], event=self.event)
+        self.assertEqual(self.registered_count(), 1)
+
+    def test_rejection_and_delete_release_seats(self):
+        first = Registration.objects.create(user=self.users[0], event=self.event, accepted=True)
+        second = Registration.objects.create(user=self.users[1], event=self.event)
+
+        first.rejected = True
+        first.save()
+        self.assertFalse(first.accepted)
+        self.assertEqual(self.registered_count(), 1)
+
+        Registration.objects.create(user=self.users[2], event=self.event)
+        first = Registration.objects.get(pk=first.pk)
+        first.rejected = False
+        with self.assertRaises(EventFull):
+            first.save()
+
+        second.delete()
+        first.save()
+        self.assertEqual(self.registered_count(), 2)
+
+    def test_saving_stale_event_keeps_seat_count(self):
+        stale = Event.objects.get(pk=self.event.pk)
+        Registration.objects.create(user=self.users[0], event=self.event)
+
+        stale.title = 'Renamed'
+        stale.save()
+        self.assertEqual(self.registered_count(), 1)
+        self.assertEqual(self.event.title, 'Renamed')
+
+
+class WaitlistTest(TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(username=f'testuser{i}', password='testpassword')
+            for i in range(6)
+        ]
+        self.venue = Venue.objects.create(
+            name='Test Venue',
+            capacity=100,
+            amenities='Amenity 1, Amenity 2'
+        )
+        self.event = Event.objects.create(
+            title='Test Event',
+            description='Test Description',
+            date=timezone.now().date() + timedelta(days=1),
+            time=timezone.now().time(),
+            location=self.venue,
+            capacity=2,
+            category=utils.CATEGORY_CHOICES[0][0],
+            created_by=self.users[0]
+        )
+        self.registrations = [
+            Registration.objects.create(user=user, event=self.event) for user in self.users[:2]
+        ]
+        for user in self.users[2:]:
+            WaitlistEntry.objects.join(user, self.event.pk)
+
+    def ranks(self):
+        return list(
+            WaitlistEntry.objects.with_rank().filter(event=self.event)
+            .order_by('rank').values_list('user__username', 'rank')
+        )
+
+    def registered_usernames(self):
+        return set(Registration.objects.filter(event=self.event).values_list('user__username', flat=True))
+
+    def test_ranks_follow_join_order(self):
+        self.assertEqual(self.ranks(), [('testuser2', 1), ('testuser3', 2), ('testuser4', 3), ('testuser5', 4)])
+
+    def test_delete_promotes_head_of_queue(self):
+        self.registrations[0].delete()
+        self.assertIn('testuser2', self.registered_usernames())
+        self.assertEqual(self.ranks(), [('testuser3', 1), ('testuser4', 2), ('testuser5', 3)])
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.registered_count, 2)
+
+    def test_rejection_promotes_head_of_queue(self):
+        self.registrations[1].rejected = True
+        self.registrations[1].save()
+        self.assertEqual(self.registered_usernames(), {'testuser0', 'testuser1', 'testuser2'})
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.registered_count, 2)
+
+    def test_capacity_increase_promotes_batch(self):
+        self.event.capacity = 5
+        self.event.save()
+        self.assertEqual(self.registered_usernames(), {f'testuser{i}' for i in range(5)})
+        self.assertEqual(self.ranks(), [('testuser5', 1)])
+
+    def test_leaving_keeps_ranks_contiguous(self):
+        WaitlistEntry.objects.get(user=self.users[3]).delete()
+        self.users[4].delete()
+        self.assertEqual(self.ranks(), [('testuser2', 1), ('testuser5', 2)])
+
+    def test_leaving_does_not_move_other_entries(self):
+        positions = dict(WaitlistEntry.objects.values_list('user_id', 'position'))
+        entry = WaitlistEntry.objects.get(user=self.users[2])
+        # Savepoint, lock, read and upsert the departure nodes, delete, release
+        with self.assertNumQueries(6):
+            entry.delete()
+        del positions[self.users[2].pk]
+        self.assertEqual(dict(WaitlistEntry.objects.values_list('user_id', 'position')), positions)
+
+    def test_positions_are_not_reused(self):
+        WaitlistEntry.objects.get(user=self.users[5]).delete()
+        WaitlistEntry.objects.get(user=self.users[4]).delete()
+        entry = WaitlistEntry.objects.join(self.users[4], self.event.pk)
+        self.assertEqual(entry.position, 5)
+        self.assertEqual(self.ranks(), [('testuser2', 1), ('testuser3', 2), ('testuser4', 3)])
+
+    def test_ranks_in_a_long_queue(self):
+        users = User.objects.bulk_create([User(username=f'queued{i}') for i in range(300)])
+        WaitlistEntry.objects.bulk_create(
+            WaitlistEntry(user=user, event=self.event, position=5 + i) for i, user in enumerate(users)
+        )
+        WaitlistEntry.objects.filter(user__in=users[::3]).delete()
+        for user in users[1:60:6]:
+            WaitlistEntry.objects.get(user=user).delete()
+        self.registrations[0].delete()
+
+        expected = list(WaitlistEntry.objects.filter(event=self.event).order_by('position').values_list('pk', flat=True))
+        ranks = dict(WaitlistEntry.objects.with_rank().filter(event=self.event).values_list('pk', 'rank'))
+        self.assertEqual([ranks[pk] for pk in expected], list(range(1, len(expected) + 1)))
+
+    def test_rank_reads_a_bounded_number_of_nodes(self):
+        users = User.objects.bulk_create([User(username=f'queued{i}') for i in range(200)])
+        WaitlistEntry.objects.bulk_create(
+            WaitlistEntry(user=user, event=self.event, position=5 + i) for i, user in enumerate(users)
+        )
+        WaitlistEntry.objects.filter(user__in=users[:150]).delete()
+        last = WaitlistEntry.objects.order_by('-position').first()
+        # However many entries left ahead of it, a rank sums at most one node per bit of the position
+        nodes = WaitlistDeparture.objects.filter(event=self.event, node__in=WaitlistDeparture.objects.prefix_nodes(last.position))
+        self.assertLessEqual(nodes.count(), last.position.bit_length())
+        self.assertEqual(WaitlistEntry.objects.with_rank().get(pk=last.pk).rank, 54)
+
+    def test_event_delete_does_not_promote(self):
+        self.event.delete()
+        self.assertFalse(Registration.objects.exists())
+        self.assertFalse(WaitlistEntry.objects.exists())
+
+
+class RegistrationModerationTest(TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(username=f'testuser{i}', password='testpassword')
+            for i in range(4)
+        ]
+        self.venue = Venue.objects.create(
+            name='Test Venue',
+            capacity=100,
+            amenities='Amenity 1, Amenity 2'
+        )
+        self.event = Event.objects.create(
+            title='Test Event',
+            description='Test Description',
+            date=timezone.now().date() + timedelta(days=1),
+            time=timezone.now().time(),
+            location=self.venue,
+            capacity=3,
+            category=utils.CATEGORY_CHOICES[0][0],
+            created_by=self.users[0]
+        )
+        self.registrations = [
+            Registration.objects.create(user=user, event=self.event) for user in self.users[:3]
+        ]
+        WaitlistEntry.objects.join(self.users[3], self.event.pk)
+
+    def weights(self):
+        return dict(CategoryAffinity.objects.values_list('user__username', 'weight'))
+
+    def test_accept_updates_rows_and_affinity_in_batch(self):
+        before = Registration.objects.get(pk=self.registrations[0].pk).updated_at
+        with CaptureQueriesContext(connection) as context:
+            updated, skipped = Registration.objects.filter(event=self.event).moderate(accept=True)
+        self.assertEqual(len(context.captured_queries), 9)
+        # The event is locked before the registration rows, like Registration.save does
+        selects = [query['sql'] for query in context.captured_queries if query['sql'].startswith('SELECT')]
+        self.assertIn('FROM "events_event"', selects[0])
+        self.assertIn('FROM "events_registration"', selects[1])
+        self.assertEqual((updated, skipped), (3, 0))
+        self.assertEqual(Registration.objects.filter(accepted=True).count(), 3)
+        self.assertGreater(Registration.objects.get(pk=self.registrations[0].pk).updated_at, before)
+        self.assertEqual(self.weights(), {'testuser0': 1, 'testuser1': 1, 'testuser2': 1})
+
+        # Already accepted rows are left alone
+        self.assertEqual(Registration.objects.filter(event=self.event).moderate(accept=True), (0, 0))
+        self.assertEqual(self.weights(), {'testuser0': 1, 'testuser1': 1, 'testuser2': 1})
+
+    def test_reject_releases_seats_and_promotes_waitlist(self):
+        Registration.objects.filter(pk=self.registrations[0].pk).moderate(accept=True)
+        updated, _ = Registration.objects.filter(pk__in=[r.pk for r in self.registrations[:2]]).moderate(accept=False)
+
+        self.assertEqual(updated, 2)
+        self.assertEqual(self.weights(), {})
+        self.assertTrue(Registration.objects.filter(user=self.users[3], event=self.event).exists())
+        self.assertFalse(WaitlistEntry.objects.exists())
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.registered_count, 2)
+
+    def test_accepting_rejected_registrations_needs_free_seats(self):
+        Registration.objects.filter(pk__in=[r.pk for r in self.registrations[:2]]).moderate(accept=False)
+        # The waitlisted user took one of the two freed seats
+        updated, skipped = Registration.objects.filter(rejected=True).moderate(accept=True)
+        self.assertEqual((updated, skipped), (1, 1))
+        self.assertEqual(list(Registration.objects.filter(rejected=True).values_list('pk', flat=True)), [self.registrations[1].pk])
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.registered_count, 3)
+
+
+class ImportEventsCommandTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.venue = Venue.objects.create(
+            name='Test Venue',
+            capacity=100,
+            amenities='Amenity 1, Amenity 2'
+        )
+
+    def test_import_in_chunks(self):
+        day = (timezone.now().date() + timedelta(days=2)).isoformat()
+        with TemporaryDirectory() as directory:
+            path = f'{directory}/events.csv'
+            with open(path, 'w') as fileobj:
+                fileobj.write('title,description,date,time,location,capacity,category\n')
+                for i in range(5):
+                    fileobj.write(f'Event {i},Desc,{day},18:00,Test Venue,{-1 if i == 3 else 10},Concerts\n')
+
+            stdout, stderr = StringIO(), StringIO()
+            call_command('import_events', path, user='testuser', chunk_size=2, stdout=stdout, stderr=stderr)
+
+        self.assertEqual(Event.objects.count(), 4)
+        self.assertIn('Imported 4 events, skipped 1 rows.', stdout.getvalue())
+        self.assertIn('Row 5: capacity', stderr.getvalue())
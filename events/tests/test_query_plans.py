@@ -0,0 +1,124 @@
+from urllib.parse import parse_qs, urlparse
+
+from django.contrib.auth.models import AnonymousUser
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from events.filters import encode_since
+from events.models import Event, User, Venue
+from events.pagination import PAGE_SIZE
+from events.tests.query_plans import QueryPlanMixin
+from events.utils import CATEGORY_CHOICES
+from events.views import EventViewSet, RegistrationExportViewSet, RegistrationViewSet, WaitlistViewSet
+
+
+# Full scans that are accepted, by the queryset that runs them
+ACCEPTED_SCANS = {
+    # Catalogue order is pk order: the scan walks the rowids and stops after one page
+    "event list": ["events_event"],
+    # Preference depends on the user's categories, which no index orders by, so every
+    # event is ranked and sorted. The per-user response cache serves the repeats.
+    "personalized event list": ["events_event"],
+    # Same pk-order walk as the event list, stopping after one page
+    "registration list for admins": ["events_registration"],
+}
+
+
+class HotQueryPlanTestCase(QueryPlanMixin, TestCase):
+    """The querysets the main endpoints run must seek an index, not scan a table."""
+
+    def setUp(self):
+        self.date = timezone.now().date() + timezone.timedelta(days=2)
+        self.category = CATEGORY_CHOICES[0][0]
+        self.admin_user = User.objects.create_superuser(username='adminuser', password='adminpassword')
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.venue = Venue.objects.create(name='Test Venue', capacity=100, amenities='')
+        self.event, _ = [
+            Event.objects.create(
+                title=f'Test Event {i}',
+                description='',
+                date=self.date + timezone.timedelta(days=i),
+                time=timezone.now().time(),
+                location=self.venue,
+                capacity=10,
+                category=self.category,
+                created_by=self.admin_user
+            )
+            for i in range(2)
+        ]
+
+    def view(self, viewset, query=None, user=None):
+        request = Request(APIRequestFactory().get("/", query or {}))
+        request.user = user or AnonymousUser()
+        return viewset(action="list", request=request, args=(), kwargs={}, format_kwarg=None)
+
+    def list_queryset(self, viewset, query=None, user=None):
+        """What ``list`` reads for the first numbered page."""
+        view = self.view(viewset, query, user)
+        return view.filter_queryset(view.get_queryset())[:PAGE_SIZE]
+
+    def cursor_queryset(self, viewset, user=None):
+        """What ``list`` reads for the page behind a next cursor link."""
+        view = self.view(viewset, {"pagination": "cursor", "page_size": 1}, user)
+        view.paginate_queryset(view.filter_queryset(view.get_queryset()))
+        cursor = parse_qs(urlparse(view.paginator.paginator.get_next_link()).query)["cursor"][0]
+        view = self.view(viewset, {"cursor": cursor, "page_size": 1}, user)
+        paginator = view.paginator.select(view.request)
+        return paginator._page_queryset(view.filter_queryset(view.get_queryset()), view.request)
+
+    def test_unfiltered_lists(self):
+        self.assertNoFullScan(self.list_queryset(EventViewSet), allow=ACCEPTED_SCANS["event list"])
+        self.assertNoFullScan(
+            self.list_queryset(EventViewSet, user=self.user), allow=ACCEPTED_SCANS["personalized event list"]
+        )
+        self.assertNoFullScan(
+            self.list_queryset(RegistrationViewSet, user=self.admin_user),
+            allow=ACCEPTED_SCANS["registration list for admins"]
+        )
+
+    def test_events_by_category_and_date(self):
+        self.assertNoFullScan(self.list_queryset(EventViewSet, {"category": self.category}))
+        self.assertNoFullScan(self.list_queryset(EventViewSet, {"category": self.category, "date": self.date}))
+
+    def test_events_by_location_and_date(self):
+        self.assertNoFullScan(self.list_queryset(EventViewSet, {"location": self.venue.pk}))
+        self.assertNoFullScan(self.list_queryset(EventViewSet, {"location": self.venue.pk, "date": self.date}))
+
+    def test_personalized_events(self):
+        queryset = self.list_queryset(EventViewSet, {"category": self.category}, user=self.user)
+        self.assertIn("preferred", queryset.query.annotations)
+        self.assertNoFullScan(queryset)
+        self.assertNoFullScan(self.list_queryset(EventViewSet, {"location": self.venue.pk}, user=self.user))
+
+    def test_event_cursor_page(self):
+        self.assertNoFullScan(self.cursor_queryset(EventViewSet))
+        self.assertNoFullScan(self.cursor_queryset(EventViewSet, user=self.user))
+
+    def test_registrations_by_user_and_event(self):
+        self.assertNoFullScan(self.list_queryset(RegistrationViewSet, user=self.user))
+        self.assertNoFullScan(self.list_queryset(RegistrationViewSet, {"user": self.user.pk}, user=self.admin_user))
+        self.assertNoFullScan(self.list_queryset(RegistrationViewSet, {"event": self.event.pk}, user=self.admin_user))
+
+    def test_incremental_export(self):
+        view = self.view(RegistrationExportViewSet, {"since": encode_since(timezone.now(), 1)}, user=self.admin_user)
+        self.assertNoFullScan(view.filter_queryset(view.get_queryset()).order_by("updated_at", "pk"))
+
+    def test_waitlist_with_rank(self):
+        queryset = self.list_queryset(WaitlistViewSet, user=self.user)
+        self.assertNoFullScan(queryset)
+        # A rank seeks single tree nodes, it never walks the entries ahead of it
+        plan = self.query_plan(queryset)
+        self.assertTrue(any("(event_id=? AND node=?)" in step for step in plan), plan)
+        self.assertFalse(any("position<" in step for step in plan), plan)
+        self.assertNoFullScan(self.list_queryset(WaitlistViewSet, {"event": self.event.pk}, user=self.user))
+
+    def test_venue_calendar(self):
+        self.assertNoFullScan(self.venue.get_booked_dates())
+
+    def test_full_scan_is_reported(self):
+        with self.assertRaisesMessage(AssertionError, "Full table scan"):
+            self.assertNoFullScan(Event.objects.filter(title="Concert"))
+        with self.assertRaisesMessage(AssertionError, "Allowed scan no longer"):
+            self.assertNoFullScan(Event.objects.filter(pk=1), allow=["events_event"])
@@ -0,0 +1,21 @@
+from django.test import SimpleTestCase
+
+from events.startup import STARTUP_BUDGET_RSS_MB, STARTUP_BUDGET_SECONDS, measure_startup
+
+
+class StartupBudgetTestCase(SimpleTestCase):
+    """Worker boot must not pull in libraries that only exports and imports use."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.startup = measure_startup()
+
+    def test_heavy_modules_load_lazily(self):
+        self.assertEqual(self.startup["heavy_modules"], [])
+
+    def test_startup_time_budget(self):
+        self.assertLess(self.startup["seconds"], STARTUP_BUDGET_SECONDS)
+
+    def test_peak_rss_budget(self):
+        self.assertLess(self.startup["peak_rss_mb"], STARTUP_BUDGET_RSS_MB)
@@ -1,13 +1,36 @@
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import IntegrityError, connection, transaction
+from django.http import FileResponse
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIRequestFactory, APIClient, APITestCase
 from django.utils import timezone
+from django.utils.http import http_date
 from datetime import datetime
-
-from events.models import User, Venue, Event, Registration
-from events.serializers import UserSerializer, VenueSerializer, EventSerializer, RegistrationSerializer, RegistrationExportSerializer
+from io import BytesIO
+import json
+import pyarrow as pa
+import pyarrow.parquet as pq
+from tempfile import TemporaryDirectory
+from django.test import override_settings
+from openpyxl import load_workbook
+from unittest import mock
+
+from events.models import User, Venue, Event, Registration, WaitlistEntry, ExportJob
+from events.serializers import BulkRegistrationSerializer, UserSerializer, VenueSerializer, EventSerializer, RegistrationSerializer, RegistrationExportSerializer
 from events.views import UserViewSet, VenueViewSet, EventViewSet, RegistrationViewSet, RegistrationExportViewSet
+from events.pagination import BoundedPageNumberPagination
+from events.cache import response_cache
+from events import imports, jobs
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from events.authentication import user_cache
+from events.throttling import TokenBucketThrottle, local_buckets
+from rest_framework.request import Request
+from django.conf import settings
+from django.core.cache import caches
+import os
+import time
 from events.utils import CATEGORY_CHOICES
 
 class VenueViewSetTestCase(APITestCase):
@@ -238,6 +261,38 @@ class VenueViewSetTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(str(response.data["results"]), str(expected_data))
 
+    def test_list_venue_query_count_is_flat(self):
+        self.client.force_authenticate(user=self.admin_user)
+        url = reverse("venues-list")
+
+        def add_venues(count):
+            for i in range(count):
+                venue = Venue.objects.create(name=f'Venue {Venue.objects.count()}', capacity=100, amenities='All')
+                for days in (2, 3):
+                    Event.objects.create(
+                        title='Test Event',
+                        description='Test Description',
+                        date=timezone.now().date() + timezone.timedelta(days=days),
+                        time=timezone.now().time(),
+                        location=venue,
+                        capacity=100,
+                        category=CATEGORY_CHOICES[0][0],
+                        created_by=self.admin_user
+                    )
+
+        add_venues(1)
+        with CaptureQueriesContext(connection) as small_page:
+            response = self.client.get(url, {"page_size": 50})
+        self.assertEqual(len(response.json()["results"]), 2)
+
+        add_venues(8)
+        with CaptureQueriesContext(connection) as large_page:
+            response = self.client.get(url, {"page_size": 50})
+        self.assertEqual(len(response.json()["results"]), 10)
+        self.assertEqual(len(response.json()["results"][-1]["booked_dates"]), 2)
+
+        self.assertEqual(len(small_page), len(large_page))
+
     def test_authenticated_admin_user_create_venue(self):
         self.client.force_authenticate(user=self.admin_user)
         url = reverse("venues-list")
@@ -252,6 +307,73 @@ class VenueViewSetTestCase(APITestCase):
         
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
+    def test_authenticated_admin_user_venue_availability(self):
+        today = timezone.now().date()
+        Event.objects.create(
+            title='Test Event',
+            description='Test Description',
+            date=today + timezone.timedelta(days=2),
+            time=timezone.now().time(),
+            location=self.venue,
+            capacity=100,
+            category=CATEGORY_CHOICES[0][0],
+            created_by=self.admin_user
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        url = reverse("venues-availability", kwargs={"pk": self.venue.id})
+
+        response = self.client.get(url, {"from": today, "to": today + timezone.timedelta(days=4)})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["free"], [
+            {"start": str(today), "end": str(today + timezone.timedelta(days=1))},
+            {"start": str(today + timezone.timedelta(days=3)), "end": str(today + timezone.timedelta(days=4))},
+        ])
+        self.assertEqual(response.json()["booked"], [
+            {"start": str(today + timezone.timedelta(days=2)), "end": str(today + timezone.timedelta(days=2))},
+        ])
+
+        response = self.client.get(url, {"date": today + timezone.timedelta(days=2)})
+        self.assertFalse(response.json()["free"])
+
+        response = self.client.get(url, {"from": today + timezone.timedelta(days=4), "to": today})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_authenticated_admin_user_venue_search(self):
+        day = timezone.now().date() + timezone.timedelta(days=2)
+        small_venue = Venue.objects.create(name='Small Venue', capacity=10, amenities='None')
+        busy_venue = Venue.objects.create(name='Busy Venue', capacity=500, amenities='All')
+        free_venue = Venue.objects.create(name='Free Venue', capacity=300, amenities='All')
+        Event.objects.create(
+            title='Test Event',
+            description='Test Description',
+            date=day + timezone.timedelta(days=1),
+            time=timezone.now().time(),
+            location=busy_venue,
+            capacity=100,
+            category=CATEGORY_CHOICES[0][0],
+            created_by=self.admin_user
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        url = reverse("venues-search")
+
+        response = self.client.get(url, {"capacity": 50, "date": day, "page_size": 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([venue["id"] for venue in response.json()["results"]], [self.venue.id])
+
+        response = self.client.get(response.json()["next"])
+        self.assertEqual(
+            [venue["id"] for venue in response.json()["results"]], [busy_venue.id]
+        )
+
+        response = self.client.get(url, {"capacity": 50, "from": day, "to": day + timezone.timedelta(days=1)})
+        self.assertEqual(
+            [venue["id"] for venue in response.json()["results"]], [self.venue.id, free_venue.id]
+        )
+        self.assertNotIn(small_venue.id, [venue["id"] for venue in response.json()["results"]])
+
+        response = self.client.get(url, {"capacity": 50})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
 ##############################################################################
 
 class EventViewSetTestCase(APITestCase):
@@ -499,6 +621,45 @@ class EventViewSetTestCase(APITestCase):
         
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
+    def test_authenticated_list_event_attended_categories_first(self):
+        other_event = Event.objects.create(
+            title='Other Event',
+            description='Test Description',
+            date=timezone.now().date() + timezone.timedelta(days=2),
+            time=timezone.now().time(),
+            location=self.venue,
+            capacity=100,
+            category=CATEGORY_CHOICES[1][0],
+            created_by=self.admin_user
+        )
+        attended_event = Event.objects.create(
+            title='Attended Event',
+            description='Test Description',
+            date=timezone.now().date() + timezone.timedelta(days=3),
+            time=timezone.now().time(),
+            location=self.venue,
+            capacity=100,
+            category=CATEGORY_CHOICES[1][0],
+            created_by=self.admin_user
+        )
+        Registration.objects.create(user=self.user, event=attended_event, accepted=True)
+
+        self.client.force_authenticate(user=self.user)
+        url = reverse("events-list")
+        response = self.client.get(url, {"page_size": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["count"], 3)
+        self.assertEqual(
+            [event["id"] for event in response.json()["results"]],
+            [other_event.id, attended_event.id]
+        )
+
+        response = self.client.get(url, {"page_size": 2, "page": 2})
+        self.assertEqual(
+            [event["id"] for event in response.json()["results"]],
+            [self.event.id]
+        )
+
 ###############################################################################
 
 class RegistrationViewSetTestCase(APITestCase):
@@ -830,3 +991,1162 @@ class UserViewSetTestCase(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(str(response.data["results"]), str(expected_data))
+
+###############################################################################
+
+class RegistrationExportViewSetTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpassword'
+        )
+        self.admin_user = User.objects.create_superuser(
+            username='adminuser',
+            email='admin@example.com',
+            password='adminpassword'
+        )
+        self.venue = Venue.objects.create(name='Test Venue', capacity=100, amenities='Amenity 1')
+        self.event = Event.objects.create(
+            title='Test Event',
+            description='Test Description',
+            date=timezone.now().date() + timezone.timedelta(days=2),
+            time=timezone.now().time(),
+            location=self.venue,
+            capacity=100,
+            category=CATEGORY_CHOICES[0][0],
+            created_by=self.admin_user
+        )
+        self.registrations = [
+            Registration.objects.create(user=self.user, event=self.event),
+            Registration.objects.create(user=self.admin_user, event=self.event, accepted=True),
+        ]
+        self.url = reverse("registration_export")
+
+    def read_rows(self, content):
+        workbook = load_workbook(BytesIO(content), read_only=True)
+        return [list(row) for row in workbook.active.iter_rows(values_only=True)]
+
+    def test_normal_user_export_forbidden(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_admin_user_export(self):
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        rows = self.read_rows(b"".join(response.streaming_content))
+        self.assertEqual(rows[0], ['user_username', 'event_title', 'registration_date', 'accepted'])
+        self.assertEqual([row[0] for row in rows[1:]], ['testuser', 'adminuser'])
+
+    def test_xlsx_export_reads_rows_in_one_query(self):
+        users = User.objects.bulk_create([User(username=f'exported{i}') for i in range(30)])
+        Registration.objects.bulk_create(Registration(user=user, event=self.event) for user in users)
+        self.client.force_authenticate(user=self.admin_user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+            content = b"".join(response.streaming_content)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Cursor lookup plus one joined export query, regardless of row count
+        self.assertEqual(len(queries), 2)
+        self.assertIn('attachment; filename="registrations.xlsx"', response["Content-Disposition"])
+        rows = self.read_rows(content)
+        self.assertEqual(len(rows), 33)
+        self.assertEqual(rows[1][2], RegistrationExportSerializer(self.registrations[0]).data["registration_date"])
+
+    def test_admin_user_export_job(self):
+        self.client.force_authenticate(user=self.admin_user)
+        url = reverse("registration_export_jobs-list")
+
+        with TemporaryDirectory() as storage_dir, override_settings(EXPORT_JOBS_EAGER=True, EXPORT_STORAGE_DIR=storage_dir):
+            response = self.client.post(url, {"user": self.user.id})
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            job = response.json()
+            self.assertEqual(job["status"], "done")
+            self.assertEqual(job["rows_total"], 1)
+
+            response = self.client.get(reverse("registration_export_jobs-detail", kwargs={"pk": job["id"]}))
+            self.assertEqual(response.json()["progress"], 1.0)
+
+            response = self.client.get(job["download_url"])
+            rows = self.read_rows(b"".join(response.streaming_content))
+            self.assertEqual([row[0] for row in rows[1:]], ['testuser'])
+
+            # Same filters reuse the artifact until registrations change
+            response = self.client.post(url, {"user": self.user.id})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json()["id"], job["id"])
+
+            self.registrations[0].accepted = True
+            self.registrations[0].save()
+            response = self.client.post(url, {"user": self.user.id})
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.assertNotEqual(response.json()["id"], job["id"])
+
+    def test_abandoned_export_job_is_replaced(self):
+        self.client.force_authenticate(user=self.admin_user)
+        params = jobs.clean_params({"user": str(self.user.id)})
+        abandoned = ExportJob.objects.create(
+            params=params,
+            fingerprint=jobs.export_fingerprint(params),
+            status=ExportJob.RUNNING,
+            heartbeat_at=timezone.now() - timezone.timedelta(seconds=settings.EXPORT_JOB_TIMEOUT + 1),
+        )
+        # One live job per filter set
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ExportJob.objects.create(params=params, fingerprint=abandoned.fingerprint)
+
+        with TemporaryDirectory() as storage_dir, override_settings(EXPORT_JOBS_EAGER=True, EXPORT_STORAGE_DIR=storage_dir):
+            response = self.client.post(reverse("registration_export_jobs-list"), {"user": self.user.id})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()["status"], "done")
+        self.assertNotEqual(response.json()["id"], str(abandoned.id))
+        # Failed by the timeout, then superseded like any other failed job
+        self.assertEqual([str(pk) for pk in ExportJob.objects.values_list("id", flat=True)], [response.json()["id"]])
+
+    def test_missing_export_file_is_gone(self):
+        self.client.force_authenticate(user=self.admin_user)
+        url = reverse("registration_export_jobs-list")
+
+        with TemporaryDirectory() as storage_dir, override_settings(EXPORT_JOBS_EAGER=True, EXPORT_STORAGE_DIR=storage_dir):
+            job = self.client.post(url, {"format": "csv"}).json()
+            os.remove(jobs.artifact_path(ExportJob.objects.get(pk=job["id"])))
+            response = self.client.get(job["download_url"])
+            self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+            response = self.client.post(url, {"format": "csv"})
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.assertEqual(self.client.get(response.json()["download_url"]).status_code, status.HTTP_200_OK)
+
+    def test_export_job_keeps_range_filters(self):
+        self.client.force_authenticate(user=self.admin_user)
+        future = (timezone.now() + timezone.timedelta(days=1)).isoformat()
+
+        with TemporaryDirectory() as storage_dir, override_settings(EXPORT_JOBS_EAGER=True, EXPORT_STORAGE_DIR=storage_dir):
+            job = self.client.post(
+                reverse("registration_export_jobs-list"), {"registration_date_after": future, "accepted": "true"}
+            ).json()
+        self.assertEqual(job["rows_total"], 0)
+        self.assertEqual(
+            ExportJob.objects.get(pk=job["id"]).params,
+            {"registration_date_after": future, "accepted": "true", "format": "xlsx"},
+        )
+
+    def test_export_job_invalid_filters(self):
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.post(reverse("registration_export_jobs-list"), {"event": 999})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(reverse("registration_export_jobs-list"), {"format": "pdf"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_admin_user_export_job_parquet(self):
+        self.client.force_authenticate(user=self.admin_user)
+
+        with TemporaryDirectory() as storage_dir, override_settings(EXPORT_JOBS_EAGER=True, EXPORT_STORAGE_DIR=storage_dir):
+            job = self.client.post(reverse("registration_export_jobs-list"), {"format": "parquet"}).json()
+            self.assertEqual(job["rows_written"], 2)
+
+            response = self.client.get(job["download_url"])
+            self.assertIn('filename="registrations.parquet"', response["Content-Disposition"])
+            table = pq.read_table(BytesIO(b"".join(response.streaming_content)))
+            self.assertEqual(table.num_rows, 2)
+
+    def test_admin_user_export_formats(self):
+        self.client.force_authenticate(user=self.admin_user)
+
+        response = self.client.get(self.url, {"format": "csv"})
+        self.assertEqual(response["Content-Type"], "text/csv")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], "user_username,event_title,registration_date,accepted")
+        self.assertEqual([line.split(",")[0] for line in lines[1:]], ['testuser', 'adminuser'])
+
+        response = self.client.get(self.url, {"format": "jsonl"})
+        records = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([record["accepted"] for record in records], [False, True])
+
+        response = self.client.get(self.url, HTTP_ACCEPT="application/vnd.apache.parquet")
+        table = pq.read_table(BytesIO(b"".join(response.streaming_content)))
+        self.assertEqual(table.column("user_username").to_pylist(), ['testuser', 'adminuser'])
+
+        response = self.client.get(self.url, {"format": "arrow"})
+        table = pa.ipc.open_stream(b"".join(response.streaming_content)).read_all()
+        self.assertEqual(table.column("accepted").to_pylist(), [False, True])
+
+        response = self.client.get(self.url, {"format": "pdf"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_binary_formats_stream_batch_by_batch(self):
+        self.client.force_authenticate(user=self.admin_user)
+        for export_format in ("parquet", "arrow"):
+            response = self.client.get(self.url, {"format": export_format})
+            self.assertNotIsInstance(response, FileResponse)
+            chunks = list(response.streaming_content)
+            # The header and first batch go out before the writer is closed
+            self.assertTrue(chunks[0])
+            self.assertGreater(len(chunks), 1)
+
+    def test_normal_user_export_format_forbidden(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url, {"format": "csv"})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response["Content-Type"], "application/json")
+
+    def export_usernames(self, params):
+        response = self.client.get(self.url, {"format": "csv", **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        return [line.split(",")[0] for line in lines[1:]], response["X-Export-Cursor"]
+
+    def test_admin_user_export_filters(self):
+        self.client.force_authenticate(user=self.admin_user)
+
+        self.assertEqual(self.export_usernames({"user": self.user.id})[0], ['testuser'])
+        self.assertEqual(self.export_usernames({"accepted": "true"})[0], ['adminuser'])
+
+        future = (timezone.now() + timezone.timedelta(days=1)).isoformat()
+        self.assertEqual(self.export_usernames({"registration_date_after": future})[0], [])
+
+        response = self.client.get(self.url, {"format": "csv", "since": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_admin_user_incremental_export(self):
+        self.client.force_authenticate(user=self.admin_user)
+
+        usernames, cursor = self.export_usernames({})
+        self.assertEqual(usernames, ['testuser', 'adminuser'])
+        self.assertEqual(self.export_usernames({"since": cursor}), ([], cursor))
+
+        self.registrations[0].accepted = True
+        self.registrations[0].save()
+        usernames, next_cursor = self.export_usernames({"since": cursor})
+        self.assertEqual(usernames, ['testuser'])
+        self.assertNotEqual(next_cursor, cursor)
+        self.assertEqual(self.export_usernames({"since": next_cursor})[0], [])
+
+        since = self.registrations[0].updated_at.isoformat()
+        self.assertEqual(self.export_usernames({"since": since})[0], ['testuser'])
+
+
+class WaitlistViewSetTestCase(APITestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(
+            username='adminuser',
+            email='admin@example.com',
+            password='adminpassword'
+        )
+        self.users = [
+            User.objects.create_user(username=f'testuser{i}', email=f'test{i}@example.com', password='testpassword')
+            for i in range(3)
+        ]
+        self.venue = Venue.objects.create(name='Test Venue', capacity=100, amenities='Amenity 1, Amenity 2')
+        self.event = Event.objects.create(
+            title='Test Event',
+            description='Test Description',
+            date=timezone.now().date() + timezone.timedelta(days=2),
+            time=timezone.now().time(),
+            location=self.venue,
+            capacity=1,
+            category=CATEGORY_CHOICES[0][0],
+            created_by=self.admin_user
+        )
+        self.registration = Registration.objects.create(user=self.users[0], event=self.event)
+
+    def join(self, user):
+        self.client.force_authenticate(user=user)
+        return self.client.post(reverse("waitlist-list"), {"event": self.event.id})
+
+    def test_join_full_event_and_read_rank(self):
+        self.assertEqual(self.join(self.users[1]).data["rank"], 1)
+        response = self.join(self.users[2])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["rank"], 2)
+
+        response = self.client.get(reverse("waitlist-detail", kwargs={"pk": response.data["id"]}))
+        self.assertEqual(response.data["rank"], 2)
+
+    def test_join_rejected_when_registered_or_seats_free(self):
+        response = self.join(self.users[0])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.registration.delete()
+        response = self.join(self.users[1])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_leave_moves_followers_up(self):
+        first = self.join(self.users[1]).data
+        self.join(self.users[2])
+        self.client.force_authenticate(user=self.users[1])
+        response = self.client.delete(reverse("waitlist-detail", kwargs={"pk": first["id"]}))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        self.client.force_authenticate(user=self.users[2])
+        response = self.client.get(reverse("waitlist-list"))
+        self.assertEqual([entry["rank"] for entry in response.data["results"]], [1])
+
+    def test_registration_delete_promotes(self):
+        self.join(self.users[1])
+        self.registration.delete()
+        self.assertTrue(Registration.objects.filter(user=self.users[1], event=self.event).exists())
+        self.assertFalse(WaitlistEntry.objects.exists())
+
+
+class BulkRegistrationTestCase(APITestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(
+            username='adminuser',
+            email='admin@example.com',
+            password='adminpassword'
+        )
+        self.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpassword')
+        self.venue = Venue.objects.create(name='Test Venue', capacity=100, amenities='Amenity 1, Amenity 2')
+        self.event = Event.objects.create(
+            title='Test Event',
+            description='Test Description',
+            date=timezone.now().date() + timezone.timedelta(days=2),
+            time=timezone.now().time(),
+            location=self.venue,
+            capacity=2,
+            category=CATEGORY_CHOICES[0][0],
+            created_by=self.admin_user
+        )
+        self.url = reverse("registrations-bulk")
+
+    def test_unauthenticated_bulk_registration(self):
+        response = self.client.post(self.url, [{"event": self.event.id}], format="json")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_bulk_registration_reports_each_item(self):
+        Registration.objects.create(user=self.user, event=self.event)
+        members = User.objects.bulk_create([User(username=f'member{i}', email=f'member{i}@example.com') for i in range(3)])
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.post(self.url, [
+            {"user": self.user.id, "event": self.event.id},
+            {"user": members[0].id, "event": self.event.id},
+            {"user": members[0].id, "event": self.event.id},
+            {"user": members[1].id, "event": self.event.id + 100},
+            {"user": "x", "event": self.event.id},
+            {"user": members[2].id, "event": self.event.id},
+        ], format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        results = response.data["results"]
+        self.assertEqual([result["status"] for result in results], ["error", "created", "error", "error", "error", "error"])
+        self.assertIn("already registered", str(results[0]["errors"]["event"]))
+        self.assertIn("already registered", str(results[2]["errors"]["event"]))
+        self.assertIn("does not exist", str(results[3]["errors"]["event"]))
+        self.assertIn("user", results[4]["errors"])
+        self.assertEqual(results[5]["errors"], {"event": ["Event is full."]})
+        self.assertEqual((response.data["created"], response.data["failed"]), (1, 5))
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.registered_count, 2)
+        self.assertEqual(Registration.objects.get(pk=results[1]["id"]).user, members[0])
+
+    def test_normal_user_can_only_register_themselves(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.url, {"registrations": [
+            {"event": self.event.id},
+            {"user": self.admin_user.id, "event": self.event.id},
+        ]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data["results"][0]["user"], self.user.id)
+        self.assertIn("user", response.data["results"][1]["errors"])
+
+    def test_bulk_registration_query_count_does_not_grow(self):
+        max_items = BulkRegistrationSerializer.max_items
+        self.event.capacity = max_items + 10
+        self.event.save()
+        members = User.objects.bulk_create([
+            User(username=f'member{i}', email=f'member{i}@example.com') for i in range(max_items + 10)
+        ])
+        self.client.force_authenticate(user=self.admin_user)
+        payload = [{"user": member.id, "event": self.event.id} for member in members]
+
+        with CaptureQueriesContext(connection) as small:
+            self.client.post(self.url, payload[:10], format="json")
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.post(self.url, payload[10:], format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Registration.objects.filter(event=self.event).count(), max_items + 10)
+        # All rows go in with one executemany
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+        last = response.data["results"][-1]
+        self.assertEqual(Registration.objects.get(pk=last["id"]).user_id, members[-1].id)
+
+
+class RegistrationModerationViewTestCase(APITestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(
+            username='adminuser',
+            email='admin@example.com',
+            password='adminpassword'
+        )
+        self.users = User.objects.bulk_create([
+            User(username=f'member{i}', email=f'member{i}@example.com') for i in range(5)
+        ])
+        self.venue = Venue.objects.create(name='Test Venue', capacity=100, amenities='Amenity 1, Amenity 2')
+        self.event = Event.objects.create(
+            title='Test Event',
+            description='Test Description',
+            date=timezone.now().date() + timezone.timedelta(days=2),
+            time=timezone.now().time(),
+            location=self.venue,
+            capacity=10,
+            category=CATEGORY_CHOICES[0][0],
+            created_by=self.admin_user
+        )
+        self.registrations = [Registration.objects.create(user=user, event=self.event) for user in self.users]
+        self.url = reverse("registrations-moderate")
+
+    def test_normal_user_cannot_moderate(self):
+        self.client.force_authenticate(user=self.users[0])
+        response = self.client.post(self.url, {"event": self.event.id, "action": "accept"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_moderate_by_ids_and_filters(self):
+        self.client.force_authenticate(user=self.admin_user)
+        ids = [registration.id for registration in self.registrations[:2]]
+        response = self.client.post(self.url, {"event": self.event.id, "action": "reject", "ids": ids}, format="json")
+        self.assertEqual(response.data, {"updated": 2, "skipped_event_full": 0})
+
+        response = self.client.post(self.url, {"event": self.event.id, "action": "accept", "rejected": False}, format="json")
+        self.assertEqual(response.data["updated"], 3)
+        self.assertEqual(
+            list(Registration.objects.filter(accepted=True).values_list("pk", flat=True).order_by("pk")),
+            [registration.id for registration in self.registrations[2:]]
+        )
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.registered_count, 3)
+
+    def test_admin_action_uses_bulk_moderation(self):
+        self.client.force_login(self.admin_user)
+        response = self.client.post(reverse("admin:events_registration_changelist"), {
+            "action": "accept_registrations",
+            "_selected_action": [registration.id for registration in self.registrations],
+        }, follow=True)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Registration.objects.filter(accepted=True).count(), 5)
+
+
+class EventImportTestCase(APITestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(
+            username='adminuser',
+            email='admin@example.com',
+            password='adminpassword'
+        )
+        self.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpassword')
+        self.venue = Venue.objects.create(name='Test Venue', capacity=100, amenities='Amenity 1, Amenity 2')
+        self.other_venue = Venue.objects.create(name='Other Venue', capacity=50, amenities='Amenity 1')
+        self.url = reverse("events-import")
+        self.day = (timezone.now().date() + timezone.timedelta(days=3)).isoformat()
+
+    def csv_file(self, lines, name="events.csv"):
+        upload = BytesIO("\n".join(lines).encode())
+        upload.name = name
+        return upload
+
+    def test_normal_user_cannot_import(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.url, {"file": self.csv_file(["title"])}, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_csv_import_reports_bad_rows(self):
+        self.client.force_authenticate(user=self.admin_user)
+        upload = self.csv_file([
+            "title,description,date,time,location,capacity,category",
+            f"Opening,Desc,{self.day},18:00,Test Venue,100,Concerts",
+            f"By id,Desc,{self.day},19:00,{self.other_venue.id},20,Meetups",
+            f"Nowhere,Desc,{self.day},19:00,Missing Venue,20,Meetups",
+            "Past,Desc,2000-01-01,19:00,Test Venue,20,Meetups",
+            f"Bad category,Desc,{self.day},19:00,Test Venue,20,Nope",
+        ])
+        response = self.client.post(self.url, {"file": upload}, format="multipart")
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual([error["row"] for error in response.data["errors"]], [4, 5, 6])
+        self.assertIn("location", response.data["errors"][0]["errors"])
+        self.assertIn("date", response.data["errors"][1]["errors"])
+        self.assertIn("category", response.data["errors"][2]["errors"])
+
+        self.assertEqual(Event.objects.get(title="By id").location, self.other_venue)
+        self.assertEqual(Event.objects.get(title="Opening").created_by, self.admin_user)
+        self.venue.refresh_from_db()
+        self.assertEqual(len(self.venue.booked_ranges), 1)
+
+    def test_xlsx_import(self):
+        from openpyxl import Workbook
+
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(["title", "description", "date", "time", "location", "capacity", "category"])
+        day = timezone.now().date() + timezone.timedelta(days=3)
+        sheet.append(["Opening", "Desc", datetime(day.year, day.month, day.day), "18:00", "Test Venue", 100, "Concerts"])
+        sheet.append(["By id", "Desc", day.isoformat(), "19:00", self.other_venue.id, 20.0, "Meetups"])
+        upload = BytesIO()
+        workbook.save(upload)
+        upload.seek(0)
+        upload.name = "events.xlsx"
+
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.post(self.url, {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Event.objects.count(), 2)
+
+    def test_missing_columns_reject_the_file(self):
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.post(self.url, {"file": self.csv_file(["title,date", "x,y"])}, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("Missing columns", str(response.data["file"]))
+
+    def test_unreadable_tail_reports_saved_chunks(self):
+        self.client.force_authenticate(user=self.admin_user)
+        lines = ["title,description,date,time,location,capacity,category"]
+        # The decoder reads ahead, so the broken line goes well past the first chunk
+        lines += [f"Event {i},Desc,{self.day},18:00,Test Venue,10,Concerts" for i in range(2 * imports.CHUNK_SIZE)]
+        upload = BytesIO("\n".join(lines).encode() + b"\nBroken,\xff\xfe\n")
+        upload.name = "events.csv"
+
+        response = self.client.post(self.url, {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data["created"], imports.CHUNK_SIZE)
+        self.assertEqual(Event.objects.count(), imports.CHUNK_SIZE)
+        self.assertIn("Unreadable CSV file", str(response.data["file"]))
+
+        # Unreadable before anything was saved: the whole file is rejected
+        upload = BytesIO(lines[0].encode() + b"\nBroken,\xff\xfe\n")
+        upload.name = "events.csv"
+        response = self.client.post(self.url, {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Event.objects.count(), imports.CHUNK_SIZE)
+
+    def test_venue_lookup_is_batched(self):
+        self.client.force_authenticate(user=self.admin_user)
+        lines = ["title,description,date,time,location,capacity,category"]
+        lines += [f"Event {i},Desc,{self.day},18:00,{'Test Venue' if i % 2 else self.other_venue.id},10,Concerts" for i in range(50)]
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(self.url, {"file": self.csv_file(lines)}, format="multipart")
+
+        self.assertEqual(response.data["created"], 50)
+        venue_lookups = [query for query in context.captured_queries if 'FROM "events_venue"' in query["sql"]]
+        self.assertEqual(len(venue_lookups), 1)
+
+
+class CursorPaginationTestCase(APITestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(
+            username='adminuser',
+            email='admin@example.com',
+            password='adminpassword'
+        )
+        self.venue = Venue.objects.create(name='Test Venue', capacity=100, amenities='Amenity 1, Amenity 2')
+        today = timezone.now().date()
+        # Several events share a date and even a time, so the cursor must carry the whole key
+        Event.objects.bulk_create([
+            Event(
+                title=f'Event {i}',
+                description='Test Description',
+                date=today + timezone.timedelta(days=2 + i % 3),
+                time=datetime(2000, 1, 1, 10 + i % 2).time(),
+                location=self.venue,
+                capacity=10,
+                category=CATEGORY_CHOICES[0][0],
+                created_by=self.admin_user
+            )
+            for i in range(23)
+        ])
+        self.client.force_authenticate(user=self.admin_user)
+
+    def walk(self, url, link):
+        items, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            items += response.data["results"]
+            url = response.data[link]
+            pages += 1
+        return items, pages
+
+    def test_events_walk_catalogue_in_date_order(self):
+        items, pages = self.walk(reverse("events-list") + "?pagination=cursor&page_size=5", "next")
+        self.assertEqual(pages, 5)
+        expected = list(Event.objects.order_by("date", "time", "pk").values_list("pk", flat=True))
+        self.assertEqual([item["id"] for item in items], expected)
+        self.assertNotIn("count", self.client.get(reverse("events-list") + "?pagination=cursor").data)
+
+    def test_previous_links_walk_back(self):
+        response = self.client.get(reverse("events-list") + "?pagination=cursor&page_size=5")
+        last_page = response.data
+        while last_page["next"]:
+            last_page = self.client.get(last_page["next"]).data
+        self.assertIsNone(self.client.get(reverse("events-list") + "?pagination=cursor").data["previous"])
+
+        items, pages = self.walk(last_page["previous"], "previous")
+        items = last_page["results"] + items
+        self.assertEqual(len({item["id"] for item in items}), 23)
+
+    def test_page_cost_does_not_grow_with_depth(self):
+        url = reverse("events-list") + "?pagination=cursor&page_size=5"
+        with CaptureQueriesContext(connection) as first:
+            response = self.client.get(url)
+        for _ in range(3):
+            response = self.client.get(response.data["next"])
+        with CaptureQueriesContext(connection) as deep:
+            self.client.get(response.data["next"])
+        self.assertEqual(len(first.captured_queries), len(deep.captured_queries))
+        self.assertFalse(any("COUNT(" in query["sql"] or "OFFSET" in query["sql"] for query in deep.captured_queries))
+
+    def test_cursor_keeps_sub_millisecond_times(self):
+        Event.objects.all().delete()
+        today = timezone.now().date()
+        for microsecond in (500, 900):
+            Event.objects.create(
+                title=f'Event {microsecond}',
+                description='Test Description',
+                date=today + timezone.timedelta(days=2),
+                time=datetime(2000, 1, 1, 10, 0, 0, microsecond).time(),
+                location=self.venue,
+                capacity=10,
+                category=CATEGORY_CHOICES[0][0],
+                created_by=self.admin_user
+            )
+        first = self.client.get(reverse("events-list") + "?pagination=cursor&page_size=1").data
+        second = self.client.get(first["next"]).data
+        self.assertNotEqual(first["results"][0]["id"], second["results"][0]["id"])
+        self.assertIsNone(second["next"])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse("events-list") + "?cursor=bogus")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_users_and_registrations_cursor_mode(self):
+        users = User.objects.bulk_create([User(username=f'member{i}', email=f'member{i}@example.com') for i in range(6)])
+        event = Event.objects.first()
+        Registration.objects.bulk_create([Registration(user=user, event=event) for user in users])
+
+        items, pages = self.walk(reverse("users-list") + "?pagination=cursor&page_size=4", "next")
+        self.assertEqual([item["id"] for item in items], list(User.objects.order_by("pk").values_list("pk", flat=True)))
+        items, pages = self.walk(reverse("registrations-list") + "?pagination=cursor&page_size=4", "next")
+        self.assertEqual((len(items), pages), (6, 2))
+
+
+class PageSizeTestCase(APITestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(
+            username='adminuser',
+            email='admin@example.com',
+            password='adminpassword'
+        )
+        User.objects.bulk_create([User(username=f'member{i}', email=f'member{i}@example.com') for i in range(14)])
+        self.client.force_authenticate(user=self.admin_user)
+        self.url = reverse("users-list")
+
+    def test_page_size_is_per_request(self):
+        self.assertEqual(len(self.client.get(self.url, {"page_size": 3}).data["results"]), 3)
+        # An earlier request's size must not leak into the next one
+        self.assertEqual(len(self.client.get(self.url).data["results"]), 10)
+
+    def test_page_size_is_capped(self):
+        with mock.patch.object(BoundedPageNumberPagination, "max_page_size", 4):
+            response = self.client.get(self.url, {"page_size": 1000000})
+        self.assertEqual(len(response.data["results"]), 4)
+
+    def test_count_free_mode(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url, {"page_size": 10, "count": "false"})
+        self.assertNotIn("count", response.data)
+        self.assertEqual(len(response.data["results"]), 10)
+        self.assertIsNone(response.data["previous"])
+        self.assertFalse(any("COUNT(" in query["sql"] for query in context.captured_queries))
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(len(response.data["results"]), 5)
+        self.assertIsNone(response.data["next"])
+        self.assertNotIn("page=", response.data["previous"])
+
+        response = self.client.get(self.url, {"count": "false", "page": 9})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ResponseCacheTestCase(APITestCase):
+    def setUp(self):
+        response_cache().clear()
+        self.admin_user = User.objects.create_superuser(
+            username='adminuser',
+            email='admin@example.com',
+            password='adminpassword'
+        )
+        self.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpassword')
+        self.venue = Venue.objects.create(name='Test Venue', capacity=100, amenities='Amenity 1, Amenity 2')
+        self.event = Event.objects.create(
+            title='Test Event',
+            description='Test Description',
+            date=timezone.now().date() + timezone.timedelta(days=2),
+            time=timezone.now().time(),
+            location=self.venue,
+            capacity=10,
+            category=CATEGORY_CHOICES[0][0],
+            created_by=self.admin_user
+        )
+
+    def test_event_list_and_detail_are_cached(self):
+        for url in (reverse("events-list"), reverse("events-detail", kwargs={"pk": self.event.id})):
+            self.assertEqual(self.client.get(url)["X-Cache"], "MISS")
+            # Only the conditional GET validator is computed
+            with self.assertNumQueries(1):
+                response = self.client.get(url)
+            self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(self.client.get(reverse("events-list"), {"page_size": 1})["X-Cache"], "MISS")
+
+    def test_links_are_not_shared_across_hosts(self):
+        Event.objects.create(
+            title='Second Event',
+            description='Test Description',
+            date=timezone.now().date() + timezone.timedelta(days=3),
+            time=timezone.now().time(),
+            location=self.venue,
+            capacity=10,
+            category=CATEGORY_CHOICES[0][0],
+            created_by=self.admin_user
+        )
+        url = reverse("events-list")
+        self.client.get(url, {"page_size": 1}, HTTP_HOST="evil.example")
+        response = self.client.get(url, {"page_size": 1}, HTTP_HOST="events.example")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertTrue(response.data["next"].startswith("http://events.example/"))
+
+    def test_saves_invalidate_dependent_responses(self):
+        event_url = reverse("events-detail", kwargs={"pk": self.event.id})
+        venue_url = reverse("venues-detail", kwargs={"pk": self.venue.id})
+        self.client.force_authenticate(user=self.admin_user)
+        self.client.get(event_url)
+        self.client.get(venue_url)
+
+        Registration.objects.create(user=self.user, event=self.event)
+        response = self.client.get(event_url)
+        self.assertEqual((response["X-Cache"], response.data["registered_count"]), ("MISS", 1))
+
+        self.client.get(venue_url)
+        self.event.title = 'Renamed Event'
+        self.event.save()
+        response = self.client.get(venue_url)
+        self.assertEqual((response["X-Cache"], response.data["events"][0]["title"]), ("MISS", 'Renamed Event'))
+
+    def test_personalized_list_varies_on_user(self):
+        url = reverse("events-list")
+        self.client.force_authenticate(user=self.user)
+        self.client.get(url)
+        self.assertEqual(self.client.get(url)["X-Cache"], "HIT")
+        self.client.force_authenticate(user=self.admin_user)
+        self.assertEqual(self.client.get(url)["X-Cache"], "MISS")
+
+    def test_file_based_cache(self):
+        with TemporaryDirectory() as directory, override_settings(CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+            "responses": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": directory},
+        }):
+            url = reverse("events-detail", kwargs={"pk": self.event.id})
+            self.assertEqual(self.client.get(url)["X-Cache"], "MISS")
+            self.assertEqual(self.client.get(url)["X-Cache"], "HIT")
+            self.event.title = 'Renamed Event'
+            self.event.save()
+            response = self.client.get(url)
+            self.assertEqual((response["X-Cache"], response.data["title"]), ("MISS", 'Renamed Event'))
+
+
+class ConditionalGetTestCase(APITestCase):
+    def setUp(self):
+        response_cache().clear()
+        self.admin_user = User.objects.create_superuser(
+            username='adminuser',
+            email='admin@example.com',
+            password='adminpassword'
+        )
+        self.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpassword')
+        self.venue = Venue.objects.create(name='Test Venue', capacity=100, amenities='Amenity 1, Amenity 2')
+        self.events = [
+            Event.objects.create(
+                title=f'Test Event {i}',
+                description='Test Description',
+                date=timezone.now().date() + timezone.timedelta(days=2 + i),
+                time=timezone.now().time(),
+                location=self.venue,
+                capacity=10,
+                category=CATEGORY_CHOICES[0][0],
+                created_by=self.admin_user
+            )
+            for i in range(2)
+        ]
+        self.detail_url = reverse("events-detail", kwargs={"pk": self.events[0].id})
+
+    def test_detail_answers_304_without_serializing(self):
+        response = self.client.get(self.detail_url)
+        self.assertIn("ETag", response)
+        self.assertIn("Last-Modified", response)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get(self.detail_url)["Last-Modified"]
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_changes_produce_new_validators(self):
+        etag = self.client.get(self.detail_url)["ETag"]
+        # Seats are taken with a queryset update, which must move updated_at as well
+        Registration.objects.create(user=self.user, event=self.events[0])
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_list_validator_tracks_deletions(self):
+        url = reverse("events-list")
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Deleting an event that is not the latest change leaves Max(updated_at) alone
+        self.events[0].delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_list_has_no_last_modified(self):
+        url = reverse("events-list")
+        response = self.client.get(url)
+        self.assertNotIn("Last-Modified", response)
+
+        self.events[0].delete()
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("Last-Modified", self.client.get(reverse("async-events-list")))
+
+    def test_venue_validators_follow_events(self):
+        self.client.force_authenticate(user=self.admin_user)
+        url = reverse("venues-detail", kwargs={"pk": self.venue.id})
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.events[1].title = 'Renamed Event'
+        self.events[1].save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_missing_object_is_still_404(self):
+        response = self.client.get(reverse("events-detail", kwargs={"pk": 999}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(reverse("events-detail", kwargs={"pk": "abc"}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class AsyncReadViewTestCase(APITestCase):
+    def setUp(self):
+        response_cache().clear()
+        self.admin_user = User.objects.create_superuser(
+            username='adminuser',
+            email='admin@example.com',
+            password='adminpassword'
+        )
+        self.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpassword')
+        self.venue = Venue.objects.create(name='Test Venue', capacity=100, amenities='Amenity 1, Amenity 2')
+        self.events = [
+            Event.objects.create(
+                title=f'Test Event {i}',
+                description='Test Description',
+                date=timezone.now().date() + timezone.timedelta(days=2 + i),
+                time=timezone.now().time(),
+                location=self.venue,
+                capacity=10,
+                category=CATEGORY_CHOICES[i % 2][0],
+                created_by=self.admin_user
+            )
+            for i in range(3)
+        ]
+
+    def authenticate(self, user):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+
+    def assertSameAsSync(self, sync_url, async_url):
+        sync_response, async_response = self.client.get(sync_url), self.client.get(async_url)
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        # Page links point back at the endpoint that served them
+        self.assertEqual(
+            json.loads(async_response.content.decode().replace("/api/async/", "/api/")), sync_response.json()
+        )
+        return async_response
+
+    def test_event_list_and_detail_match_sync_views(self):
+        self.assertSameAsSync(reverse("events-list"), reverse("async-events-list"))
+        self.assertSameAsSync(reverse("events-list") + "?page_size=2&page=2", reverse("async-events-list") + "?page_size=2&page=2")
+        self.assertSameAsSync(reverse("events-list") + "?count=false", reverse("async-events-list") + "?count=false")
+        self.assertSameAsSync(
+            reverse("events-detail", kwargs={"pk": self.events[1].id}),
+            reverse("async-events-detail", kwargs={"pk": self.events[1].id}),
+        )
+
+    def test_event_filters(self):
+        category = CATEGORY_CHOICES[1][0]
+        response = self.assertSameAsSync(
+            reverse("events-list") + f"?category={category}", reverse("async-events-list") + f"?category={category}"
+        )
+        self.assertEqual([event["id"] for event in response.json()["results"]], [self.events[1].id])
+
+        response = self.assertSameAsSync(
+            reverse("events-list") + f"?location={self.venue.id}", reverse("async-events-list") + f"?location={self.venue.id}"
+        )
+        self.assertEqual(len(response.json()["results"]), len(self.events))
+
+        for query in ("?date=not-a-date", "?location=999", "?location=abc", "?date=not-a-date&location=999"):
+            response = self.assertSameAsSync(reverse("events-list") + query, reverse("async-events-list") + query)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_event_cursor_pages(self):
+        url = reverse("async-events-list") + "?pagination=cursor&page_size=2"
+        first = self.client.get(url).json()
+        self.assertEqual([event["id"] for event in first["results"]], [self.events[0].id, self.events[1].id])
+        second = self.client.get(first["next"]).json()
+        self.assertEqual([event["id"] for event in second["results"]], [self.events[2].id])
+        self.assertIsNone(second["next"])
+
+    def test_personalized_for_authenticated_user(self):
+        Registration.objects.create(user=self.user, event=self.events[1], accepted=True)
+        self.authenticate(self.user)
+
+        response = self.assertSameAsSync(reverse("events-list"), reverse("async-events-list"))
+        self.assertEqual(response.json()["results"][0]["id"], self.events[1].id)
+
+    def test_missing_event(self):
+        response = self.client.get(reverse("async-events-detail", kwargs={"pk": 999}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.json(), {"detail": "Not found."})
+
+    def test_invalid_token(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer not-a-token')
+        response = self.client.get(reverse("async-events-list"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("WWW-Authenticate", response)
+
+    def test_venues_are_admin_only(self):
+        url = reverse("async-venues-list")
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.authenticate(self.user)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_venue_list_and_detail_match_sync_views(self):
+        self.authenticate(self.admin_user)
+        Venue.objects.create(name='Empty Venue', capacity=10, amenities='')
+        self.assertSameAsSync(reverse("venues-list"), reverse("async-venues-list"))
+        response = self.assertSameAsSync(
+            reverse("venues-detail", kwargs={"pk": self.venue.id}),
+            reverse("async-venues-detail", kwargs={"pk": self.venue.id}),
+        )
+        self.assertEqual(len(response.json()["events"]), len(self.events))
+
+    def test_response_cache_and_conditional_get(self):
+        url = reverse("async-events-detail", kwargs={"pk": self.events[0].id})
+        first = self.client.get(url)
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(self.client.get(url)["X-Cache"], "HIT")
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.events[0].title = 'Renamed'
+        self.events[0].save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["title"], 'Renamed')
+
+
+class CachedJWTAuthenticationTestCase(APITestCase):
+    def setUp(self):
+        user_cache.clear()
+        response_cache().clear()
+        self.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpassword')
+        self.venue = Venue.objects.create(name='Test Venue', capacity=100, amenities='Amenity 1, Amenity 2')
+        response = self.client.post(reverse("token_obtain_pair"), {"username": "testuser", "password": "testpassword"})
+        self.token = response.json()["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+    def user_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        return response, [query for query in queries if 'FROM "events_user"' in query['sql']]
+
+    def test_token_carries_flags(self):
+        token = AccessToken(self.token)
+        self.assertFalse(token["is_staff"])
+        self.assertFalse(token["is_superuser"])
+
+    def test_user_is_loaded_once(self):
+        response, queries = self.user_queries(reverse("registrations-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 1)
+
+        response, queries = self.user_queries(reverse("registrations-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(queries, [])
+
+    def test_deactivation_evicts_user(self):
+        self.client.get(reverse("registrations-list"))
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(reverse("registrations-list"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_staff_change_evicts_user(self):
+        self.assertEqual(self.client.get(reverse("venues-list")).status_code, status.HTTP_403_FORBIDDEN)
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(self.client.get(reverse("venues-list")).status_code, status.HTTP_200_OK)
+
+    def test_deleted_user_is_rejected(self):
+        self.client.get(reverse("registrations-list"))
+        self.user.delete()
+        response = self.client.get(reverse("registrations-list"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(JWT_USER_CACHE_TTL=0)
+    def test_cache_can_be_disabled(self):
+        self.client.get(reverse("registrations-list"))
+        response, queries = self.user_queries(reverse("registrations-list"))
+        self.assertEqual(len(queries), 1)
+
+    def test_event_reads_use_token_user(self):
+        Event.objects.create(
+            title='Test Event',
+            description='Test Description',
+            date=timezone.now().date() + timezone.timedelta(days=2),
+            time=timezone.now().time(),
+            location=self.venue,
+            capacity=10,
+            category=CATEGORY_CHOICES[0][0],
+            created_by=self.user
+        )
+        response, queries = self.user_queries(reverse("events-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["count"], 1)
+        self.assertEqual(queries, [])
+
+
+@override_settings(REST_FRAMEWORK={
+    **settings.REST_FRAMEWORK,
+    'DEFAULT_THROTTLE_RATES': {'read': '3/min', 'write': '2/min', 'export': '1/hour'},
+})
+class ThrottlingTestCase(APITestCase):
+    def setUp(self):
+        local_buckets.clear()
+        response_cache().clear()
+        self.admin_user = User.objects.create_superuser(
+            username='adminuser',
+            email='admin@example.com',
+            password='adminpassword'
+        )
+        self.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpassword')
+        self.other_user = User.objects.create_user(username='otheruser', email='other@example.com', password='testpassword')
+
+    def tearDown(self):
+        local_buckets.clear()
+
+    def exhaust(self, url, count):
+        for _ in range(count):
+            self.assertNotEqual(self.client.get(url).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_read_budget_per_client(self):
+        url = reverse("events-list")
+        self.exhaust(url, 3)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "20")
+
+        # Users have their own budgets, apart from their IP address
+        self.client.force_authenticate(user=self.user)
+        self.exhaust(url, 3)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.client.force_authenticate(user=self.other_user)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+    def test_anonymous_clients_by_ip(self):
+        url = reverse("events-list")
+        self.exhaust(url, 3)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(self.client.get(url, REMOTE_ADDR='10.0.0.2').status_code, status.HTTP_200_OK)
+
+    def test_forwarded_for_needs_trusted_proxies(self):
+        url = reverse("events-list")
+        self.exhaust(url, 3)
+        # A spoofed header does not buy a fresh budget
+        response = self.client.get(url, HTTP_X_FORWARDED_FOR='10.0.0.9')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        rest_framework = {**settings.REST_FRAMEWORK, "NUM_PROXIES": 1}
+        with override_settings(REST_FRAMEWORK=rest_framework):
+            # The one proxy appends the address it saw
+            response = self.client.get(url, HTTP_X_FORWARDED_FOR='1.2.3.4, 10.0.0.9')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_writes_have_their_own_budget(self):
+        self.client.force_authenticate(user=self.user)
+        self.exhaust(reverse("events-list"), 3)
+        url = reverse("registrations-list")
+        self.assertEqual(self.client.post(url, {"event": 999}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.post(url, {"event": 999}).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(url, {"event": 999})
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "30")
+
+    def test_exports_have_their_own_budget(self):
+        self.client.force_authenticate(user=self.admin_user)
+        url = reverse("registration_export") + "?format=csv"
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "3600")
+        self.assertEqual(self.client.get(reverse("events-list")).status_code, status.HTTP_200_OK)
+
+    def test_budget_refills(self):
+        url = reverse("events-list")
+        with mock.patch("events.throttling.time.monotonic", return_value=1000.0):
+            self.exhaust(url, 3)
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        with mock.patch("events.throttling.time.monotonic", return_value=1020.0):
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(THROTTLE_CACHE_ALIAS='default')
+    def test_shared_budget(self):
+        caches['default'].clear()
+        url = reverse("events-list")
+        self.exhaust(url, 3)
+        # Another process sees the same bucket; this one keeps nothing locally
+        local_buckets.clear()
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        caches['default'].clear()
+
+    def test_async_views_are_throttled(self):
+        url = reverse("async-events-list")
+        self.exhaust(url, 3)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "20")
+
+    @override_settings(THROTTLE_CACHE_ALIAS='default')
+    def test_async_views_share_the_budget(self):
+        caches['default'].clear()
+        self.exhaust(reverse("events-list"), 3)
+        local_buckets.clear()
+        self.assertEqual(self.client.get(reverse("async-events-list")).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        caches['default'].clear()
+
+    def test_overhead(self):
+        request = Request(APIRequestFactory().get(reverse("events-list")))
+        request.user = self.user
+        view = EventViewSet(action='list')
+        started = time.perf_counter()
+        for _ in range(1000):
+            TokenBucketThrottle().allow_request(request, view)
+        # A few microseconds in practice; the bound leaves room for slow CI machines
+        self.assertLess((time.perf_counter() - started) / 1000, 100e-6)
@@ -0,0 +1,156 @@
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """``"600/min"`` as ``(tokens per second, bucket capacity)``; the capacity is one period's worth."""
+    if rate is None:
+        return None
+    count, period = rate.split("/")
+    count = int(count)
+    return count / PERIODS[period[0]], count
+
+
+def _refill(tokens, stamp, now, rate, capacity):
+    return min(capacity, tokens + (now - stamp) * rate)
+
+
+class LocalTokenBuckets:
+    """Token buckets in this process; a take costs a dict lookup under a lock."""
+
+    def __init__(self, max_size=100000):
+        self.max_size = max_size
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, capacity):
+        """Take a token. Returns 0 when granted, else the seconds until one is available."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            tokens = capacity if bucket is None else _refill(*bucket, now, rate, capacity)
+            if tokens >= 1:
+                if bucket is None and len(self._buckets) >= self.max_size:
+                    self._prune(now)
+                self._buckets[key] = (tokens - 1, now)
+                return 0
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / rate
+
+    async def atake(self, key, rate, capacity):
+        # Only an uncontended lock around a dict, nothing worth handing to a thread
+        return self.take(key, rate, capacity)
+
+    def _prune(self, now):
+        # Clients idle for an hour are back at full capacity for any rate up to per-hour
+        idle = [key for key, (tokens, stamp) in self._buckets.items() if now - stamp > 3600]
+        for key in idle or list(self._buckets)[:len(self._buckets) // 10]:
+            del self._buckets[key]
+
+    def clear(self):
+        self._buckets.clear()
+
+
+class SharedTokenBuckets:
+    """
+    Token buckets kept in a Django cache so every process draws from the same
+    budget. Reads and writes are not atomic, so concurrent requests from one
+    client can occasionally both get the last token.
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    def _next(self, bucket, now, rate, capacity):
+        """The bucket to store, its timeout and the wait to return."""
+        tokens = capacity if bucket is None else _refill(*bucket, now, rate, capacity)
+        # Once full again the bucket is indistinguishable from a missing one
+        timeout = int(capacity / rate) + 1
+        if tokens >= 1:
+            return (tokens - 1, now), timeout, 0
+        return (tokens, now), timeout, (1 - tokens) / rate
+
+    def take(self, key, rate, capacity):
+        cache = caches[self.alias]
+        key, now = f"events:throttle:{key}", time.time()
+        bucket, timeout, wait = self._next(cache.get(key), now, rate, capacity)
+        cache.set(key, bucket, timeout)
+        return wait
+
+    async def atake(self, key, rate, capacity):
+        cache = caches[self.alias]
+        key, now = f"events:throttle:{key}", time.time()
+        bucket, timeout, wait = self._next(await cache.aget(key), now, rate, capacity)
+        await cache.aset(key, bucket, timeout)
+        return wait
+
+
+local_buckets = LocalTokenBuckets()
+
+
+def buckets():
+    alias = getattr(settings, "THROTTLE_CACHE_ALIAS", None)
+    return SharedTokenBuckets(alias) if alias else local_buckets
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    One token bucket per client and scope. Clients are users when
+    authenticated and IP addresses otherwise; X-Forwarded-For is only trusted
+    behind the ``NUM_PROXIES`` proxies it is configured with. The scope is ``read`` for safe
+    methods and ``write`` for the rest unless the view maps its action to
+    another one in ``throttle_scopes``. Rates come from
+    ``DEFAULT_THROTTLE_RATES``; a scope without one is not throttled.
+    """
+
+    def get_scope(self, request, view):
+        scope = getattr(view, "throttle_scopes", {}).get(getattr(view, "action", None))
+        if scope is not None:
+            return scope
+        return "read" if request.method in SAFE_METHODS else "write"
+
+    def get_client(self, request):
+        user = request.user
+        if user and user.is_authenticated:
+            return f"user:{user.pk}"
+        return f"ip:{self.get_ident(request)}"
+
+    def get_ident(self, request):
+        # Without a proxy count X-Forwarded-For is whatever the client sent, so use the peer address
+        if not api_settings.NUM_PROXIES:
+            return request.META.get("REMOTE_ADDR")
+        return super().get_ident(request)
+
+    def get_rate(self, request, view):
+        scope = self.get_scope(request, view)
+        rate = parse_rate(api_settings.DEFAULT_THROTTLE_RATES.get(scope))
+        return None if rate is None else (f"{scope}:{self.get_client(request)}", *rate)
+
+    def allow_request(self, request, view):
+        rate = self.get_rate(request, view)
+        if rate is None:
+            return True
+        self.retry_after = buckets().take(*rate)
+        return self.retry_after == 0
+
+    async def aallow_request(self, request, view):
+        """``allow_request`` for async views; a shared bucket is read without blocking."""
+        rate = self.get_rate(request, view)
+        if rate is None:
+            return True
+        self.retry_after = await buckets().atake(*rate)
+        return self.retry_after == 0
+
+    def wait(self):
+        return self.retry_after
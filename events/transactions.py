@@ -0,0 +1,16 @@
+from contextlib import contextmanager, nullcontext
+
+from django.db import transaction
+
+
+@contextmanager
+def atomic_write(using=None):
+    """
+    ``transaction.atomic()`` for blocks that write. On the tuned SQLite backend
+    an outermost one begins with the ``write_transaction_mode`` option, taking
+    the write lock before its first read; read-only ``atomic()`` blocks keep a
+    deferred ``BEGIN`` and never queue behind writers.
+    """
+    writing = getattr(transaction.get_connection(using), "writing", nullcontext)
+    with writing(), transaction.atomic(using=using):
+        yield
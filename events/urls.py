@@ -4,17 +4,25 @@ from django.urls import path
 from rest_framework.routers import SimpleRouter
 from rest_framework_simplejwt.views import (TokenObtainPairView, TokenRefreshView)
 
-from .views import VenueViewSet, EventViewSet, RegistrationViewSet, RegistrationExportViewSet, UserViewSet
+from .async_views import AsyncEventView, AsyncVenueView
+from .views import VenueViewSet, EventViewSet, RegistrationViewSet, RegistrationExportViewSet, RegistrationExportJobViewSet, UserViewSet, WaitlistViewSet
 
 router = SimpleRouter()
 router.register(r'venues', VenueViewSet, basename="venues")
 router.register(r'events', EventViewSet, basename="events")
 router.register(r'registrations', RegistrationViewSet, basename="registrations")
+router.register(r'waitlist', WaitlistViewSet, basename="waitlist")
 router.register(r'users', UserViewSet, basename="users")
+router.register(r'registration_export/jobs', RegistrationExportJobViewSet, basename="registration_export_jobs")
 
 urlpatterns = (
     path('api/', include(router.urls)),
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path("api/registration_export/", RegistrationExportViewSet.as_view({'get': 'list'}), name="registration_export"),
+    # Native async reads for ASGI deployments
+    path('api/async/events/', AsyncEventView.as_view(), name="async-events-list"),
+    path('api/async/events/<int:pk>/', AsyncEventView.as_view(), name="async-events-detail"),
+    path('api/async/venues/', AsyncVenueView.as_view(), name="async-venues-list"),
+    path('api/async/venues/<int:pk>/', AsyncVenueView.as_view(), name="async-venues-detail"),
 )
@@ -2,69 +2,128 @@ from rest_framework import viewsets, permissions, status, mixins
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.parsers import MultiPartParser
+from django.db import IntegrityError
+from django.db.models import Exists, OuterRef, Prefetch, Q
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-from django.http import HttpResponse
-from io import BytesIO
-import pandas as pd
-
-from .models import Venue, Event, Registration, User
-from .serializers import VenueSerializer, EventSerializer, RegistrationSerializer, UserSerializer, RegistrationExportSerializer
-
-
-class VenueViewSet(viewsets.ModelViewSet):
+from django.http import FileResponse
+
+from .models import Venue, Event, Registration, User, ExportJob, WaitlistEntry
+from .serializers import (
+    VenueSerializer, EventSerializer, RegistrationSerializer, UserSerializer, RegistrationExportSerializer,
+    VenueAvailabilityQuerySerializer, VenueSearchQuerySerializer, VenueSearchSerializer, ExportJobSerializer,
+    WaitlistEntrySerializer, BulkRegistrationSerializer, RegistrationModerationSerializer, EventImportSerializer,
+)
+from .pagination import BoundedPageNumberPagination, VenueSearchPagination, SelectablePagination, EventPagination
+from .renderers import (
+    ExportContentNegotiation, XLSXRenderer, CSVRenderer, JSONLinesRenderer, ParquetRenderer, ArrowRenderer,
+)
+from .filters import EventFilter, RegistrationExportFilter, RegistrationModerationFilter, encode_since
+from . import exports, imports, jobs
+from .cache import CachedResponseMixin
+from .conditional import ConditionalGetMixin
+
+
+class VenueViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
     http_method_names = ("get", "post", "put", "patch", "delete")
+    # Venues embed their events, including the seats taken by registrations
+    cache_depends_on = ("venue", "event", "registration")
+    # Available dates start from today
+    validators_expire_daily = True
     queryset = Venue.objects.all().order_by("pk")
     serializer_class = VenueSerializer
     permission_classes = [permissions.IsAdminUser]
-    pagination_class = PageNumberPagination
+    pagination_class = BoundedPageNumberPagination
 
-    def list(self, request, *args, **kwargs):
-        PageNumberPagination.page_size = self.request.query_params.get('page_size',10)
-        return super().list(self, request, *args, **kwargs)
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ("list", "retrieve"):
+            # Nested events and booked dates are served from one batched query
+            return queryset.prefetch_related(Prefetch("event_set", queryset=Event.objects.order_by("pk")))
+        return queryset
+
+    def get_validator_querysets(self):
+        if self.action == "retrieve":
+            venues = Venue.objects.filter(pk=self.kwargs["pk"])
+            return [venues, Event.objects.filter(location__in=venues)]
+        return [Venue.objects.all(), Event.objects.all()]
+
+    @action(detail=True, methods=["get"])
+    def availability(self, request, *args, **kwargs):
+        venue = self.get_object()
+        query = VenueAvailabilityQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        calendar = venue.calendar
+
+        if "date" in query.validated_data:
+            day = query.validated_data["date"]
+            return Response({"venue": venue.id, "date": day, "free": calendar.is_free(day)})
+
+        start = query.validated_data.get("from", timezone.now().date())
+        end = query.validated_data.get("to", max(start, calendar.last_booked or start))
+        return Response({
+            "venue": venue.id,
+            "from": start,
+            "to": end,
+            "free": [{"start": first, "end": last} for first, last in calendar.free_ranges(start, end)],
+            "booked": [{"start": first, "end": last} for first, last in calendar.booked_ranges(start, end)],
+        })
+
+    @action(detail=False, methods=["get"])
+    def search(self, request, *args, **kwargs):
+        query = VenueSearchQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        # Single anti-join: venues big enough with no event inside the requested days
+        booked = Event.objects.filter(
+            location=OuterRef("pk"),
+            date__gte=query.validated_data["from"],
+            date__lte=query.validated_data["to"],
+        )
+        queryset = (
+            Venue.objects.filter(capacity__gte=query.validated_data["capacity"])
+            .filter(~Exists(booked))
+            .only("id", "name", "capacity", "amenities")
+        )
+
+        paginator = VenueSearchPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = VenueSearchSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
 
-class EventViewSet(viewsets.ModelViewSet):
+class EventViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
     http_method_names = ("get", "post", "put", "patch", "delete")
-    queryset = Event.objects.all()
+    cache_depends_on = ("event", "registration")
+    # Reads only need the user's id, so they skip loading the user
+    token_user_actions = ("list", "retrieve")
+    queryset = Event.objects.all().order_by("pk")
     serializer_class = EventSerializer
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ["category", "date", "location",]
-    pagination_class = PageNumberPagination
+    filterset_class = EventFilter
+    pagination_class = EventPagination
 
     def get_permissions(self):
-        if self.action in ['create', 'update', 'partial_update', 'destroy']:
+        if self.action in ['create', 'update', 'partial_update', 'destroy', 'import_file']:
             self.permission_classes = [permissions.IsAdminUser]
         return [permission() for permission in self.permission_classes]
 
-    def list(self, request, *args, **kwargs):
-        if not request.user.is_authenticated: return super().list(self, request, *args, **kwargs)
-        
-        PageNumberPagination.page_size = self.request.query_params.get('page_size',10)
-        event_list = self.filter_queryset(self.get_queryset())
-
-        previous_record = Registration.objects.filter(user=request.user, accepted=True)
-        previous_category_list = set([record.event.category for record in previous_record])
-
-        matching_category_events = []
-        other_events = []
-
-        for event in event_list:
-            if event.category in previous_category_list:
-                matching_category_events.append(event)
-            else:
-                other_events.append(event)
+    def is_personalized(self):
+        # Cursor pages walk the catalogue in date order, so personal ranking only applies to numbered pages
+        return self.action == 'list' and self.request.user.is_authenticated and not self.paginator.uses_cursor(self.request)
 
-        ordered_events = matching_category_events + other_events
+    def cache_varies_on_user(self):
+        return self.is_personalized()
 
-        page = self.paginate_queryset(ordered_events)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.is_personalized():
+            return queryset.personalized_for(self.request.user)
+        return queryset
 
-        serializer = self.get_serializer(ordered_events, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    def get_validator_extras(self):
+        return [self.request.user.pk] if self.is_personalized() else []
 
     def update(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -102,11 +161,36 @@ class EventViewSet(viewsets.ModelViewSet):
             status=status.HTTP_403_FORBIDDEN
         )
 
+    @action(detail=False, methods=["post"], url_path="import", url_name="import", parser_classes=[MultiPartParser])
+    def import_file(self, request, *args, **kwargs):
+        serializer = EventImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.validated_data["file"]
+        try:
+            file_format = imports.import_format(upload.name, serializer.validated_data.get("format"))
+            created, errors = imports.import_events(imports.read_rows(upload, file_format), request.user)
+        except imports.EventImportError as exc:
+            if not exc.created:
+                return Response({"file": [str(exc)]}, status=status.HTTP_400_BAD_REQUEST)
+            # Chunks read before the file turned unreadable are saved
+            return Response(
+                {"created": exc.created, "failed": len(exc.errors), "errors": exc.errors, "file": [str(exc)]},
+                status=status.HTTP_207_MULTI_STATUS
+            )
+
+        if not errors:
+            response_status = status.HTTP_201_CREATED
+        elif created:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response({"created": created, "failed": len(errors), "errors": errors}, status=response_status)
+
 
 class UserViewSet(viewsets.ModelViewSet):
     http_method_names = ("get", "patch", "post", "delete")
     serializer_class = UserSerializer
-    pagination_class = PageNumberPagination
+    pagination_class = SelectablePagination
 
     def get_permissions(self):
         if self.action in ('partial_update', 'destroy', 'list'):
@@ -118,25 +202,21 @@ class UserViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         user = self.request.user
         if user.is_superuser:
-            return User.objects.all()
-        return User.objects.filter(username=user.username)
+            return User.objects.all().order_by("pk")
+        return User.objects.filter(username=user.username).order_by("pk")
     
-    def list(self, request, *args, **kwargs):
-        PageNumberPagination.page_size = self.request.query_params.get('page_size',10)
-        return super().list(self, request, *args, **kwargs)
-
 
 class RegistrationViewSet(viewsets.ModelViewSet):
     http_method_names = ("get", "patch", "post")
     serializer_class = RegistrationSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ("user", "event")
-    pagination_class = PageNumberPagination
+    pagination_class = SelectablePagination
 
     def get_permissions(self):
-        if self.action == 'partial_update':
+        if self.action in ('partial_update', 'moderate'):
             self.permission_classes = [permissions.IsAdminUser]
-        elif self.action in ('create', 'list', 'retrieve'):
+        elif self.action in ('create', 'list', 'retrieve', 'bulk'):
             self.permission_classes = [permissions.IsAuthenticated]
         return [permission() for permission in self.permission_classes]
     
@@ -146,36 +226,121 @@ class RegistrationViewSet(viewsets.ModelViewSet):
             return Registration.objects.all().order_by("pk")
         return Registration.objects.filter(user=user).order_by("pk")
     
-    def list(self, request, *args, **kwargs):
-        PageNumberPagination.page_size = self.request.query_params.get('page_size',10)
-        return super().list(self, request, *args, **kwargs)
+    @action(detail=False, methods=["post"])
+    def bulk(self, request, *args, **kwargs):
+        data = {"registrations": request.data} if isinstance(request.data, list) else request.data
+        serializer = BulkRegistrationSerializer(data=data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        try:
+            results = serializer.save()
+        except IntegrityError:
+            return Response(
+                {"detail": "Some of these registrations were created concurrently, please retry."},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        created = sum(result["status"] == "created" for result in results)
+        if created == len(results):
+            response_status = status.HTTP_201_CREATED
+        elif created:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(
+            {"created": created, "failed": len(results) - created, "results": results},
+            status=response_status
+        )
+
+    @action(detail=False, methods=["post"])
+    def moderate(self, request, *args, **kwargs):
+        serializer = RegistrationModerationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        queryset = Registration.objects.filter(event=serializer.validated_data["event"])
+        if "ids" in serializer.validated_data:
+            queryset = queryset.filter(pk__in=serializer.validated_data["ids"])
+        filterset = RegistrationModerationFilter(data=request.data, queryset=queryset)
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        updated, skipped = filterset.qs.moderate(accept=serializer.validated_data["action"] == "accept")
+        return Response({"updated": updated, "skipped_event_full": skipped})
+
+
+class WaitlistViewSet(
+    mixins.CreateModelMixin, mixins.ListModelMixin, mixins.RetrieveModelMixin, mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    http_method_names = ("get", "post", "delete")
+    serializer_class = WaitlistEntrySerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ("event",)
+    pagination_class = BoundedPageNumberPagination
+
+    def get_queryset(self):
+        queryset = WaitlistEntry.objects.with_rank().order_by("event", "position")
+        if self.request.user.is_superuser:
+            return queryset
+        return queryset.filter(user=self.request.user)
 
 
 class RegistrationExportViewSet(viewsets.ModelViewSet):
     http_method_names = ("get",)
     permission_classes = [permissions.IsAdminUser]
     serializer_class = RegistrationExportSerializer
+    throttle_scopes = {"list": "export"}
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ("user", "event")
+    filterset_class = RegistrationExportFilter
     queryset = Registration.objects.all()
+    renderer_classes = [XLSXRenderer, CSVRenderer, JSONLinesRenderer, ParquetRenderer, ArrowRenderer]
+    content_negotiation_class = ExportContentNegotiation
 
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-
-        df = pd.DataFrame(serializer.data)
-
-        # Create a BytesIO object to hold the Excel data
-        excel_data = BytesIO()
-
-        # Save the DataFrame to the BytesIO object
-        df.to_excel(excel_data, index=False)
-
-        # Reset the file pointer position to the beginning of the BytesIO object
-        excel_data.seek(0)
+        queryset = self.filter_queryset(self.get_queryset()).order_by("updated_at", "pk")
+
+        # Freeze the upper bound so the returned cursor matches the exported rows
+        last = queryset.order_by("-updated_at", "-pk").values_list("updated_at", "pk").first()
+        if last is not None:
+            queryset = queryset.filter(Q(updated_at__lt=last[0]) | Q(updated_at=last[0], pk__lte=last[1]))
+            cursor = encode_since(*last)
+        else:
+            cursor = request.query_params.get("since", "")
+
+        response = exports.export_response(queryset, request.accepted_renderer.format)
+        response["X-Export-Cursor"] = cursor
+        return response
 
-        # Prepare the response with the BytesIO data
-        response = HttpResponse(excel_data.read(), content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
-        response["Content-Disposition"] = 'attachment; filename="registrations.xlsx"'
 
-        return response
+class RegistrationExportJobViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    http_method_names = ("get", "post")
+    permission_classes = [permissions.IsAdminUser]
+    serializer_class = ExportJobSerializer
+    # Polling a job is a cheap read; starting one is an export
+    throttle_scopes = {"create": "export"}
+    queryset = ExportJob.objects.all()
+
+    def create(self, request, *args, **kwargs):
+        params = jobs.clean_params(request.data)
+        job, created = jobs.get_or_create_job(params, request.user)
+        serializer = self.get_serializer(job)
+        return Response(serializer.data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+    @action(detail=True, methods=["get"])
+    def download(self, request, *args, **kwargs):
+        job = self.get_object()
+        if job.status != ExportJob.DONE:
+            return Response({"detail": "Export is not ready yet."}, status=status.HTTP_409_CONFLICT)
+        content_type, extension = exports.EXPORT_FORMATS[job.export_format]
+        try:
+            fileobj = open(jobs.artifact_path(job), "rb")
+        except FileNotFoundError:
+            # Marked outdated so that the next request for these filters exports again
+            ExportJob.objects.filter(pk=job.pk).update(stale=True)
+            return Response({"detail": "Export file is no longer available."}, status=status.HTTP_410_GONE)
+        return FileResponse(
+            fileobj,
+            as_attachment=True,
+            filename=f"registrations.{extension}",
+            content_type=content_type,
+        )